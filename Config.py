@@ -11,6 +11,18 @@ SMA_STEP = 1          # Step size between SMA windows (e.g., 1 = every day, 10 =
 # Evaluation Configuration
 EVAL_DAYS = 60        # Number of trading days to simulate (max 60 for 2m, min 2m for daily)
 EVAL_INTRADAY_INTERVAL = "2m"  # Intraday data interval for simulation
+EVAL_INTERVALS = ["2m", "10m", "30m", "60m"]  # Intervals compared by --intervals (the finest is downloaded, the rest resampled from it, so they must be multiples of it)
+EVAL_WORKERS = 1      # Processes sharing the SMA windows of one evaluation (1 = single process, 0 = one per CPU core)
+EVAL_STORAGE = 'float64'  # In-memory prices/SMA matrix: 'float64', 'float32' (half the memory) or 'cents' (int64 price cents, float32 SMAs)
+
+# Data Cleaning (applied once to every intraday download)
+CLEAN_NAN_POLICY = 'ffill'                # 'ffill' (carry the last price over NaNs and missing bars within a session) or 'drop'
+CLEAN_SESSION_HOURS = ("09:30", "16:00")  # Regular session in exchange time; other ticks are dropped (None = keep every tick)
+EVAL_EXTENDED_HOURS = False               # Also fetch pre/post-market ticks (flagged by the session index)
+EXTENDED_SESSION_HOURS = ("04:00", "20:00")  # Exchange-time window of ticks kept when EVAL_EXTENDED_HOURS is on
+EXTENDED_SESSIONS = ("pre", "post")       # Extended-hours parts traded when EVAL_EXTENDED_HOURS is on (() = regular session only)
+CLEAN_OUTLIER_MADS = 0                    # Clip prices beyond N scaled MADs from the trailing median (0 = disabled)
+CLEAN_OUTLIER_WINDOW = 30                 # Ticks in the trailing outlier window
 
 # Trading Configuration
 BUY_THRESHOLD = 1  # Price must be this much above SMA to buy
@@ -18,6 +30,20 @@ SELL_THRESHOLD = 1 # Price must be this much below SMA to sell
 TRADING_FEE = 0.3    # Fee per trade
 DOWNTIME_DAYS = 2     # Days to wait after selling before buying again
 
+# Successive-Halving Pruning (evaluator)
+PRUNE_CHECKPOINTS = []   # Days after which to drop the worst strategies, e.g. [5, 10, 20] ([] = disabled)
+PRUNE_FRACTION = 0.5     # Fraction of still-active strategies pruned at each checkpoint
+PRUNE_METRIC = 'profit'  # Ranking score: 'profit' (totalProfit) or 'sharpe' (risk-adjusted)
+
+# Crossover Strategy Family (fast/slow SMA pairs drawn from SMA_MIN..SMA_MAX)
+PAIR_TILE = 4096      # Pairs simulated per vectorized tile (bounds memory for large grids)
+
+# Bootstrap Robustness Runs (--bootstrap N)
+BOOTSTRAP_METHOD = 'block'  # 'block' (moving-block bootstrap of days) or 'shuffle' (permute days)
+BOOTSTRAP_BLOCK_DAYS = 5    # Consecutive trading days per bootstrap block
+BOOTSTRAP_SEED = 42         # Base seed; replicate i always uses the same RNG stream
+BOOTSTRAP_WORKERS = 0       # Worker processes (0 = one per CPU core)
+
 # Trading mode: 'momentum' (buy when price > SMA, sell when price < SMA)
 # or 'mean_reversion' (buy when price < SMA, sell when price > SMA)
 # Set to 'mean_reversion' to buy low / sell high behavior.
@@ -27,3 +53,31 @@ TRADE_MODE = 'mean_reversion'
 LOG_PRICE_INTERVAL = 100  # Log price values every N ticks (0 = log all, set high to disable)
 LOG_INDEX_INTERVAL = 100  # Log DayIndex/PriceIndex/MaxIndex every N ticks (0 = log all, set high to disable)
 EVALLOG_INTERVAL = 100    # Write to EvaluationLog.txt every N ticks (0 = log all, set high to disable)
+EVALLOG_ROTATE_MB = 100   # Start a new EvaluationLog segment once the active file reaches N MB (0 = no size limit)
+EVALLOG_ROTATE_DAYS = 0   # Start a new EvaluationLog segment every N evaluated days (0 = no day limit)
+EVALLOG_COMPRESS = 'gzip' # Compression of finished segments: 'gzip', 'zstd' (Python 3.14+ or zstandard) or '' (plain)
+
+# Debug.log levels per logger ('root' = everything else). Written by a background
+# thread; override from the CLI with --log-level LEVEL or --log-level name=LEVEL.
+# Repo modules log under their module names, e.g. 'data.StockUpdater', 'evaluate.Evaluator'.
+LOG_LEVELS = {
+    "root": "DEBUG",
+    "yfinance": "DEBUG",
+    "urllib3": "DEBUG",
+    "pandas": "DEBUG",
+    "numpy": "DEBUG",
+}
+
+# Progress / Telemetry
+METRICS_PORT = 0          # Serve Prometheus metrics on 127.0.0.1:<port>/metrics (0 = disabled)
+STATUS_INTERVAL = 2.0     # Seconds between single-line console status updates
+
+# Results Warehouse
+RESULTS_DB = "Results.db"  # SQLite (WAL) store for per-window results across runs ("" = disabled)
+
+# Live Runner Feed
+LIVE_POLL_SECONDS = 60    # Seconds between live price fetches while recording a tick journal
+
+# Result Cache
+CACHE_DIR = "Cache"       # Content-addressed cache of SMA columns and per-window results ("" = disabled)
+CACHE_MAX_MB = 512        # Least recently used entries are evicted beyond this size
@@ -0,0 +1,177 @@
+"""
+Immutable runtime configuration for one evaluation.
+
+Config.py holds the defaults. An EvalConfig is a frozen snapshot of them,
+optionally overridden from a TOML/JSON file or NAME=VALUE command line
+specs, and is passed explicitly to Evaluater, SMA, StockUpdater and
+LogManager. Several configurations can therefore be evaluated in one
+process, and fingerprint() identifies a configuration across runs.
+"""
+
+import hashlib
+import json
+import os
+
+import Config
+
+# Process-wide settings that are not part of an evaluation's configuration
+PROCESS_FIELDS = ("LOG_LEVELS",)
+
+# Config fields that only affect logging, reporting, paths or parallelism (not
+# evaluation outcomes); every other field is part of the fingerprint
+OUTPUT_FIELDS = (
+    "EVAL_WORKERS", "BOOTSTRAP_WORKERS", "PAIR_TILE",
+    "LOG_PRICE_INTERVAL", "LOG_INDEX_INTERVAL", "EVALLOG_INTERVAL",
+    "EVALLOG_ROTATE_MB", "EVALLOG_ROTATE_DAYS", "EVALLOG_COMPRESS",
+    "METRICS_PORT", "STATUS_INTERVAL", "RESULTS_DB", "LIVE_POLL_SECONDS",
+    "CACHE_DIR", "CACHE_MAX_MB",
+)
+
+
+def configFields():
+    """Names of the Config values carried by an EvalConfig."""
+    return tuple(name for name in dir(Config) if name.isupper() and name not in PROCESS_FIELDS)
+
+
+def fingerprintFields():
+    """Names of the Config values that change evaluation outcomes."""
+    return tuple(name for name in configFields() if name not in OUTPUT_FIELDS)
+
+
+def freeze(value, name="value"):
+    """Lists become tuples so a configuration cannot be mutated through its values.
+
+    Only scalars (str, int, float, bool, None) and lists/tuples of them are
+    accepted; anything else (dicts, sets, objects) raises ValueError.
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item, name) for item in value)
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    raise ValueError(f"Config parameter {name} must be a scalar or a list of scalars, got {type(value).__name__}")
+
+
+def parseValue(raw):
+    """Decode a command line value as JSON when possible (numbers, lists, null), else keep the string."""
+    raw = raw.strip()
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def parseOverrides(specs):
+    """Parse NAME=VALUE specs into an overrides dict."""
+    overrides = {}
+    for spec in specs or []:
+        name, sep, raw = spec.partition("=")
+        if not sep:
+            raise ValueError(f"Expected NAME=VALUE, got '{spec}'")
+        overrides[name.strip()] = parseValue(raw)
+    return overrides
+
+
+def loadFile(path):
+    """Read overrides from a .toml or .json file holding Config names at the top level."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        with open(path, "r") as fh:
+            values = json.load(fh)
+    elif extension == ".toml":
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            import tomli as tomllib
+        with open(path, "rb") as fh:
+            values = tomllib.load(fh)
+    else:
+        raise ValueError(f"Unsupported config file '{path}' (expected .toml or .json)")
+    if not isinstance(values, dict):
+        raise ValueError(f"Config file '{path}' must hold a table of NAME = value pairs")
+    return values
+
+
+class EvalConfig:
+    """Frozen set of Config values, read as attributes (config.SMA_MIN, config.TRADE_MODE, ...).
+
+    Build one with fromConfig/fromFile/fromArgs and derive variants with
+    replace(); assigning to an attribute raises AttributeError. Two configs
+    compare equal when all their values do.
+    """
+
+    def __init__(self, values):
+        fields = configFields()
+        unknown = sorted(set(values) - set(fields))
+        if unknown:
+            raise ValueError(f"Unknown Config parameter(s): {', '.join(unknown)}")
+        missing = [name for name in fields if name not in values]
+        if missing:
+            raise ValueError(f"Missing Config parameter(s): {', '.join(missing)}")
+        for name in fields:
+            object.__setattr__(self, name, freeze(values[name], name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("EvalConfig is immutable; derive a new one with replace()")
+
+    def __delattr__(self, name):
+        raise AttributeError("EvalConfig is immutable")
+
+    def __eq__(self, other):
+        return isinstance(other, EvalConfig) and self.asDict() == other.asDict()
+
+    def __hash__(self):
+        return hash(tuple(sorted(self.asDict().items())))
+
+    def __repr__(self):
+        return f"EvalConfig({self.fingerprint()})"
+
+    @classmethod
+    def fromConfig(cls, **overrides):
+        """Snapshot the current Config module values, with overrides applied."""
+        values = {name: getattr(Config, name) for name in configFields()}
+        cls.checkNames(overrides)
+        values.update(overrides)
+        return cls(values)
+
+    @classmethod
+    def fromFile(cls, path, **overrides):
+        """Config defaults, then the values in a TOML/JSON file, then overrides."""
+        values = loadFile(path)
+        cls.checkNames(values)
+        return cls.fromConfig(**dict(values, **overrides))
+
+    @classmethod
+    def fromArgs(cls, path=None, specs=None):
+        """Build from an optional config file plus NAME=VALUE specs (e.g. from --config/--set)."""
+        overrides = parseOverrides(specs)
+        if path:
+            return cls.fromFile(path, **overrides)
+        return cls.fromConfig(**overrides)
+
+    @staticmethod
+    def checkNames(values):
+        fields = configFields()
+        for name in values:
+            if name not in fields:
+                raise ValueError(f"Unknown Config parameter '{name}'")
+
+    def replace(self, **overrides):
+        """Return a copy with overrides applied."""
+        self.checkNames(overrides)
+        return EvalConfig(dict(self.asDict(), **overrides))
+
+    def asDict(self):
+        return {name: getattr(self, name) for name in configFields()}
+
+    def windows(self):
+        """The evaluated SMA windows, SMA_MIN..SMA_MAX in steps of SMA_STEP."""
+        return range(self.SMA_MIN, self.SMA_MAX + 1, self.SMA_STEP)
+
+    def fingerprintValues(self):
+        """The evaluation-relevant values, JSON-ready (tuples as lists)."""
+        return json.loads(json.dumps({name: getattr(self, name) for name in fingerprintFields()}))
+
+    def fingerprint(self):
+        """Stable short hash of the values that change evaluation outcomes."""
+        encoded = json.dumps(self.fingerprintValues(), sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()[:16]
@@ -5,6 +5,10 @@ import time
 import urllib.request
 import logging
 
+from EvalConfig import EvalConfig
+from data.DebugLog import configureLogging, parseLevels, stopLogging
+from data.EvalLog import removeSegments
+
 
 class Main:
     """Entry point for running evaluation or live runner flows.
@@ -14,25 +18,202 @@ class Main:
         --eval | --run    (mutually exclusive, required)    Run evaluator or live runner mode
         --stock SYMBOL    (required for --new)              Stock symbol
         --days N          (required for --new with --run)   Number of days for live runner
+        --config PATH     (optional)                        Load Config overrides from a TOML or JSON file
+        --set NAME=VALUE  (optional, repeatable)            Override a single Config value for this run
+        --metrics-port P  (optional, with --eval)           Serve Prometheus metrics on 127.0.0.1:P while running
+        --workers N       (optional, with --eval)           Spread the SMA bots over N processes (0 = one per core)
+        --crossover       (optional, with --eval)           Evaluate the fast/slow SMA crossover pair grid instead
+        --bootstrap N     (optional, with --eval)           Run N bootstrap replicates over resampled days instead
+        --vectorized      (optional, with --eval)           Backtest all windows at once, reusing cached per-window results
+        --intervals [L]   (optional, with --eval)           Backtest each interval in L (default EVAL_INTERVALS) side by side
+        --check-storage   (optional, with --eval)           Compare backtests of the float32/cents storage modes against float64
+        --record PATH     (optional, with --run)            Append live ticks to a binary tick journal
+        --replay PATH     (optional, with --run)            Feed the runner from a tick journal and report latency
+        --speed X         (optional, with --replay)         Replay pace: 1 = recorded speed, N = N times faster, 0 = max
                
-        --clean           (alternative, run with --stock)   Delete <stock>_EvaluationLog.txt and <stock>_Totals.txt
+        --clean           (alternative, run with --stock)   Delete <stock>_EvaluationLog.txt (and its segments) and <stock>_Totals.txt
     """
 
+    # EvalConfig built from --config/--set in start() (None = Config.py values)
+    config = None
+
+    def exit(self, code) -> None:
+        """Flush Debug.log and terminate immediately."""
+        stopLogging()
+        os._exit(code)
+
+    def intervalList(self, spec) -> list:
+        """Parse the --intervals list, falling back to EVAL_INTERVALS when it is empty."""
+        intervals = [interval.strip() for interval in spec.split(",") if interval.strip()]
+        return intervals or list((self.config or EvalConfig.fromConfig()).EVAL_INTERVALS)
+
+    def runCrossover(self, stockSymbol) -> None:
+        """Evaluate the fast/slow crossover grid and print/write ranked results like Analyze.py."""
+        try:
+            from data.StockUpdater import StockUpdater
+            from evaluate.Crossover import CrossoverFamily, overallStats
+            from tools.Analyze import summarize, write_csv
+        except ImportError as e:
+            print("Required dependencies are missing. Please install packages from requirements.txt and try again.")
+            logging.error(f"Import failed for CrossoverFamily: {e}")
+            self.exit(1)
+        windows, closes, smas = StockUpdater(config=self.config).smaMatrix(stockSymbol)
+        family = CrossoverFamily(windows, closes, smas, config=self.config)
+        print(f"Evaluating {family.pairCount} crossover pairs for {stockSymbol}")
+        logging.info(f"Evaluating {family.pairCount} crossover pairs for {stockSymbol}")
+        perPair = family.evaluate()
+        summarize(perPair, overallStats(perPair), top=10)
+        csvPath = f"{stockSymbol}_CrossoverAnalysis.csv"
+        write_csv(perPair, csvPath)
+        print(f"Wrote CSV to {csvPath}")
+
+    def runBootstrap(self, stockSymbol, replicates) -> None:
+        """Run bootstrap robustness replicates and print/write per-window profit distributions."""
+        try:
+            from data.StockUpdater import StockUpdater
+            from evaluate.Bootstrap import BootstrapEvaluator, printDistribution, writeDistributionCsv
+        except ImportError as e:
+            print("Required dependencies are missing. Please install packages from requirements.txt and try again.")
+            logging.error(f"Import failed for BootstrapEvaluator: {e}")
+            self.exit(1)
+        windows, prices, dayStarts, smaRows = StockUpdater(config=self.config).intradaySessions(stockSymbol)
+        print(f"Running {replicates} bootstrap replicates over {len(dayStarts) - 1} sessions for {stockSymbol}")
+        logging.info(f"Running {replicates} bootstrap replicates for {stockSymbol}")
+        bootstrap = BootstrapEvaluator(windows, prices, dayStarts, smaRows, replicates, config=self.config)
+        stats = bootstrap.summarize(bootstrap.run())
+        printDistribution(stats, top=10)
+        csvPath = f"{stockSymbol}_Bootstrap.csv"
+        writeDistributionCsv(stats, csvPath)
+        print(f"Wrote CSV to {csvPath}")
+
+    def runVectorized(self, stockSymbol) -> None:
+        """Backtest every window with the array simulator (memoized per window) and report like Analyze.py."""
+        try:
+            from data.StockUpdater import StockUpdater
+            from evaluate.Crossover import overallStats
+            from evaluate.Simulator import backtestKey, cachedBacktest
+            from tools.Analyze import per_sma_from_arrays, record_results, summarize, write_csv
+        except ImportError as e:
+            print("Required dependencies are missing. Please install packages from requirements.txt and try again.")
+            logging.error(f"Import failed for cachedBacktest: {e}")
+            self.exit(1)
+        updater = StockUpdater(config=self.config)
+        windows, prices, dayStarts, smaRows = updater.intradaySessions(stockSymbol)
+        print(f"Backtesting {len(windows)} SMA windows over {len(dayStarts) - 1} sessions for {stockSymbol}")
+        logging.info(f"Vectorized backtest of {len(windows)} windows for {stockSymbol}")
+        results = cachedBacktest(windows, prices, dayStarts, smaRows, updater.cache, backtestKey(updater.sessionKey, updater.config), updater.config)
+        perSma, risk = per_sma_from_arrays(windows, results)
+        summarize(perSma, overallStats(perSma), top=10, risk=risk)
+        csvPath = f"{stockSymbol}_Analysis.csv"
+        write_csv(perSma, csvPath, risk=risk)
+        print(f"Wrote CSV to {csvPath}")
+        resultsDb = updater.config.RESULTS_DB
+        if resultsDb:
+            runId = record_results(perSma, resultsDb, stockSymbol, None, updater.config)
+            logging.info(f"Recorded vectorized results as run {runId} in {resultsDb}")
+
+    def runIntervals(self, stockSymbol, intervals) -> None:
+        """Backtest every window on each bar interval, resampled from one download of the finest."""
+        try:
+            from data.StockUpdater import StockUpdater
+            from evaluate.Simulator import backtestKey, cachedBacktest
+            from tools.Analyze import per_sma_from_arrays, summarize_intervals, write_interval_csv
+        except ImportError as e:
+            print("Required dependencies are missing. Please install packages from requirements.txt and try again.")
+            logging.error(f"Import failed for cachedBacktest: {e}")
+            self.exit(1)
+        updater = StockUpdater(config=self.config)
+        try:
+            windows, sessions = updater.intervalSessions(stockSymbol, intervals)
+        except ValueError as e:
+            print(f"Error: {e}")
+            logging.error(str(e))
+            self.exit(1)
+        perInterval = {}
+        for interval, (prices, dayStarts, smaRows, sessionKey) in sessions.items():
+            print(f"Backtesting {len(windows)} SMA windows on {len(prices)} {interval} bars for {stockSymbol}")
+            logging.info(f"Vectorized backtest of {len(windows)} windows on {interval} bars for {stockSymbol}")
+            results = cachedBacktest(windows, prices, dayStarts, smaRows, updater.cache, backtestKey(sessionKey, updater.config), updater.config)
+            perInterval[interval], _ = per_sma_from_arrays(windows, results)
+        summarize_intervals(perInterval, top=10)
+        csvPath = f"{stockSymbol}_IntervalAnalysis.csv"
+        write_interval_csv(perInterval, csvPath)
+        print(f"Wrote CSV to {csvPath}")
+
+    def runStorageCheck(self, stockSymbol) -> None:
+        """Backtest every window in each EVAL_STORAGE mode and print the deviation from the float64 path."""
+        try:
+            from data.StockUpdater import StockUpdater
+            from evaluate.Simulator import storageAccuracy
+        except ImportError as e:
+            print("Required dependencies are missing. Please install packages from requirements.txt and try again.")
+            logging.error(f"Import failed for storageAccuracy: {e}")
+            self.exit(1)
+        config = (self.config or EvalConfig.fromConfig()).replace(EVAL_STORAGE="float64")
+        windows, prices, dayStarts, smaRows = StockUpdater(config=config).intradaySessions(stockSymbol)
+        print(f"Comparing storage modes on {len(windows)} SMA windows over {len(dayStarts) - 1} sessions for {stockSymbol}")
+        report = storageAccuracy(windows, prices, dayStarts, smaRows, config)
+        print(f"{'Storage':<9}{'Prices MB':>11}{'SMAs MB':>10}{'Max total err':>15}{'Max Sharpe err':>16}{'Trade diffs':>13}")
+        for mode, stats in report.items():
+            print(f"{mode:<9}{stats['prices_mb']:>11.2f}{stats['smas_mb']:>10.2f}{stats['max_total_error']:>15.3g}"
+                  f"{stats['max_sharpe_error']:>16.3g}{stats['trade_mismatches']:>13}")
+            logging.info(f"Storage {mode}: {stats}")
+
+    def runLive(self, stockSymbol, days, recordPath=None, replayPath=None, speed=0.0) -> None:
+        """Drive the live price feed: record ticks to a journal, or replay one and report tick latency."""
+        if not recordPath and not replayPath:
+            print(f"Runner mode not yet implemented (would run for {days} days)")
+            logging.info(f"Runner mode requested but not implemented")
+            return
+        try:
+            from data.StockUpdater import StockUpdater
+            from data.TickJournal import TickJournal, JournalReplay
+        except ImportError as e:
+            print("Required dependencies are missing. Please install packages from requirements.txt and try again.")
+            logging.error(f"Import failed for StockUpdater: {e}")
+            self.exit(1)
+        journal = TickJournal(recordPath) if recordPath else None
+        source = JournalReplay(replayPath, speed, symbol=stockSymbol) if replayPath else None
+        updater = StockUpdater(journal=journal, tickSource=source, config=self.config)
+        pollSeconds = updater.config.LIVE_POLL_SECONDS
+        latencies = []
+        wallStart = time.perf_counter()
+        deadline = time.time() + days * 86400 if days else None
+        try:
+            if source is not None:
+                print(f"Replaying {replayPath} for {stockSymbol} at " + (f"{speed:g}x" if speed > 0 else "max speed"))
+                logging.info(f"Replaying tick journal {replayPath} (speed={speed})")
+                while updater.liveUpdate() is not None:
+                    latencies.append(updater.lastTickLatency)
+            else:
+                print(f"Recording {stockSymbol} ticks to {recordPath} every {pollSeconds}s (Ctrl+C to stop)")
+                logging.info(f"Recording tick journal {recordPath}")
+                while deadline is None or time.time() < deadline:
+                    try:
+                        updater.liveUpdate()
+                        latencies.append(updater.lastTickLatency)
+                    except Exception as e:
+                        print(f"Live fetch failed, retrying next poll: {e}")
+                    time.sleep(pollSeconds)
+        except KeyboardInterrupt:
+            print("\nStopped")
+        finally:
+            if journal is not None:
+                journal.close()
+                print(f"Recorded {journal.count} tick(s) to {recordPath}")
+                logging.info(f"Recorded {journal.count} tick(s) to {recordPath}")
+        if latencies:
+            wall = time.perf_counter() - wallStart
+            ordered = sorted(latencies)
+            p50 = ordered[len(ordered) // 2] * 1000
+            p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000
+            summary = (f"{len(ordered)} ticks in {wall:.2f}s ({len(ordered) / wall:,.0f} ticks/s) | "
+                       f"tick latency p50 {p50:.3f}ms p99 {p99:.3f}ms max {ordered[-1] * 1000:.3f}ms")
+            print(summary)
+            logging.info(summary)
+
     def start(self) -> None:
         """Parse CLI flags, ensure connectivity, and dispatch actions."""
-        # configure single unified log file
-        logging.basicConfig(
-            filename="Debug.log",
-            filemode="w",
-            level=logging.DEBUG,
-            format="%(asctime)s %(levelname)s %(message)s"
-        )
-        # Allow all third-party library logs (DEBUG includes INFO, WARNING, ERROR, CRITICAL)
-        logging.getLogger("yfinance").setLevel(logging.DEBUG)
-        logging.getLogger("urllib3").setLevel(logging.DEBUG)
-        logging.getLogger("pandas").setLevel(logging.DEBUG)
-        logging.getLogger("numpy").setLevel(logging.DEBUG)
-        
         parser = argparse.ArgumentParser(
             description="SMA Evaluator/Runner - Simulate or evaluate SMA trading strategies",
             epilog="Example: python Main.py --new --eval --stock AAPL"
@@ -48,28 +229,63 @@ class Main:
 
         parser.add_argument("--stock", help="Stock symbol (required for --new and --clean)")
         parser.add_argument("--days", type=int, help="Number of days (required for --new with --run)")
+        parser.add_argument("--config", metavar="PATH", help="Load settings from a TOML or JSON file of Config names, on top of Config.py")
+        parser.add_argument("--set", action="append", metavar="NAME=VALUE", help="Override one Config value for this run (repeatable), e.g. TRADING_FEE=0.5")
+        parser.add_argument("--metrics-port", type=int, help="Serve Prometheus progress metrics on 127.0.0.1:PORT (0 = disabled, default: METRICS_PORT)")
+        parser.add_argument("--workers", type=int, metavar="N", help="Processes to spread the SMA bots of an evaluation over (0 = one per CPU core, default: EVAL_WORKERS)")
+        parser.add_argument("--crossover", action="store_true", help="Evaluate every fast/slow SMA crossover pair instead of single SMAs")
+        parser.add_argument("--bootstrap", type=int, metavar="N", help="Run N Monte Carlo replicates over resampled trading days instead of a single backtest")
+        parser.add_argument("--vectorized", action="store_true", help="Backtest all SMA windows at once with the array simulator, reusing cached per-window results")
+        parser.add_argument("--intervals", nargs="?", const="", metavar="1m,5m,...", help="Backtest several bar intervals resampled from the finest one and compare them (default: EVAL_INTERVALS)")
+        parser.add_argument("--check-storage", dest="checkStorage", action="store_true", help="Backtest all windows in every EVAL_STORAGE mode and report their deviation from float64")
+        parser.add_argument("--record", metavar="PATH", help="Record live ticks to a binary tick journal (with --run)")
+        parser.add_argument("--replay", metavar="PATH", help="Feed the runner from a recorded tick journal instead of yfinance (with --run)")
+        parser.add_argument("--speed", type=float, default=0.0, help="Replay speed multiplier: 1 = recorded pace, 0 = as fast as possible (default)")
+        parser.add_argument("--log-level", action="append", metavar="[NAME=]LEVEL", help="Debug.log level for the root logger or a named logger (repeatable), e.g. INFO or data.StockUpdater=DEBUG")
         parser.add_argument("--no-analyze", dest="no_analyze", action="store_true", help="Do not run the analyzer after evaluation completes")
 
         args = parser.parse_args()
+        if args.bootstrap is not None and args.bootstrap < 1:
+            parser.error("--bootstrap N requires N >= 1")
+
+        # configure single unified log file, written by a background thread
+        try:
+            levels = parseLevels(args.log_level)
+        except ValueError as e:
+            parser.error(str(e))
+        configureLogging("Debug.log", levels)
+
+        # one immutable configuration for everything this run evaluates
+        try:
+            self.config = EvalConfig.fromArgs(args.config, args.set)
+        except (ValueError, OSError) as e:
+            parser.error(f"Invalid configuration: {e}")
+        logging.info(f"Evaluation config {self.config.fingerprint()}")
 
         # if --clean: run cleaning and exit immediately
         if args.cleanLogs:
             if not args.stock:
                 parser.error("--stock is required when using --clean")
             deletedCount = 0
-            for path in (f"{args.stock}_EvaluationLog.txt", f"{args.stock}_Totals.txt", f"{args.stock}_Analysis.csv"):
+            for path in (f"{args.stock}_EvaluationLog.txt", f"{args.stock}_Totals.txt", f"{args.stock}_Analysis.csv",
+                         f"{args.stock}_CrossoverAnalysis.csv", f"{args.stock}_Bootstrap.csv", f"{args.stock}_Risk.csv"):
                 if os.path.exists(path):
                     os.remove(path)
                     deletedCount += 1
                     print(f"Deleted {path}")
                     logging.info(f"Deleted {path}")
+            # rotated EvaluationLog segments
+            for path in removeSegments(f"{args.stock}_EvaluationLog.txt"):
+                deletedCount += 1
+                print(f"Deleted {path}")
+                logging.info(f"Deleted {path}")
             if deletedCount == 0:
                 print(f"No existing logs found for {args.stock} (nothing to clean)")
                 logging.info(f"No existing logs found for {args.stock}")
             else:
                 print(f"Cleaned logs for {args.stock} ({deletedCount} file(s) deleted)")
                 logging.info(f"Cleaned logs for {args.stock} ({deletedCount} file(s) deleted)")
-            os._exit(0)
+            self.exit(0)
 
         # validate required arguments
         if args.new and not args.stock:
@@ -79,8 +295,8 @@ class Main:
         if not args.mode:
             parser.error("A mode (--eval or --run) is required.")
 
-        # connectivity check loop
-        connected = False
+        # connectivity check loop (a journal replay needs no network)
+        connected = bool(args.mode == "run" and args.replay)
         retries = 0
         maxRetries = 5
         while not connected and retries < maxRetries:
@@ -97,7 +313,7 @@ class Main:
         if not connected:
             print("Error: Cannot connect to the internet after multiple attempts. Exiting.")
             logging.error("Failed to connect to internet after maximum retries")
-            os._exit(1)
+            self.exit(1)
 
         # resume existing session
         if args.resume:
@@ -110,7 +326,7 @@ class Main:
                 if stockSymbol == "":
                     print("Error: Stock.txt is empty, cannot resume.")
                     logging.error("Stock.txt is empty")
-                    os._exit(1)
+                    self.exit(1)
                 
                 print(f"Resuming session for {stockSymbol}")
                 logging.info(f"Resuming session for {stockSymbol}")
@@ -118,22 +334,34 @@ class Main:
             except FileNotFoundError:
                 print("Error: Stock.txt not found. Cannot resume session without a previous session.")
                 logging.error("Stock.txt not found")
-                os._exit(1)
+                self.exit(1)
 
-            if args.mode == "eval":
+            if args.mode == "eval" and args.crossover:
+                self.runCrossover(stockSymbol)
+            elif args.mode == "eval" and args.bootstrap:
+                self.runBootstrap(stockSymbol, args.bootstrap)
+            elif args.mode == "eval" and args.vectorized:
+                self.runVectorized(stockSymbol)
+            elif args.mode == "eval" and args.intervals is not None:
+                self.runIntervals(stockSymbol, self.intervalList(args.intervals))
+            elif args.mode == "eval" and args.checkStorage:
+                self.runStorageCheck(stockSymbol)
+            elif args.mode == "eval":
                 try:
                     from evaluate.Evaluator import Evaluater
                 except ImportError as e:
                     print("Required dependencies are missing. Please install packages from requirements.txt and try again.")
                     logging.error(f"Import failed for Evaluater: {e}")
-                    os._exit(1)
-                evaluator = Evaluater(stockSymbol)
+                    self.exit(1)
+                evaluator = Evaluater(stockSymbol, metricsPort=args.metrics_port, workers=args.workers, config=self.config)
                 evaluator.start()
                 # After evaluation finishes, optionally run the analyzer to summarize results
                 if not args.no_analyze:
                     try:
                         import subprocess
                         analyze_cmd = ["python3", "tools/Analyze.py", "--stock", stockSymbol, "--top", "10", "--csv", f"{stockSymbol}_Analysis.csv", "--compare-totals"]
+                        if self.config.RESULTS_DB:
+                            analyze_cmd += ["--db", self.config.RESULTS_DB]
                         logging.info(f"Running analyzer: {' '.join(analyze_cmd)}")
                         proc = subprocess.run(analyze_cmd, capture_output=True, text=True)
                         logging.info(f"Analyzer stdout:\n{proc.stdout}")
@@ -148,12 +376,11 @@ class Main:
                     file2 = open("RunnerDays.txt", "r")
                     days = int(file2.read())
                     file2.close()
-                    print(f"Runner mode not yet implemented (would run for {days} days)")
-                    logging.info(f"Runner mode requested but not implemented")
                 except FileNotFoundError:
                     print("Error: RunnerDays.txt not found")
                     logging.error("RunnerDays.txt not found")
-                    os._exit(1)
+                    self.exit(1)
+                self.runLive(stockSymbol, days, args.record, args.replay, args.speed)
             return
 
         # new session setup
@@ -164,9 +391,17 @@ class Main:
         file3 = open("Stock.txt", "w")
         file3.write(stockSymbol)
         file3.close()
+        # each new session gets its own run id in the results store
+        from data.ResultStore import newRunId
+        fileRun = open("RunId.txt", "w")
+        fileRun.write(newRunId())
+        fileRun.close()
         file4 = open(f"{stockSymbol}_Totals.txt", "w")
         file4.write("")
         file4.close()
+        # risk metrics are resumed from this file, so a new session starts without it
+        if os.path.exists(f"{stockSymbol}_Risk.csv"):
+            os.remove(f"{stockSymbol}_Risk.csv")
 
         # reset indexes
         for path in ("PriceIndex.txt", "DayIndex.txt"):
@@ -174,10 +409,21 @@ class Main:
             file5.write("1")
             file5.close()
 
-        if args.mode == "eval":
+        if args.mode == "eval" and args.crossover:
+            self.runCrossover(stockSymbol)
+        elif args.mode == "eval" and args.bootstrap:
+            self.runBootstrap(stockSymbol, args.bootstrap)
+        elif args.mode == "eval" and args.vectorized:
+            self.runVectorized(stockSymbol)
+        elif args.mode == "eval" and args.intervals is not None:
+            self.runIntervals(stockSymbol, self.intervalList(args.intervals))
+        elif args.mode == "eval" and args.checkStorage:
+            self.runStorageCheck(stockSymbol)
+        elif args.mode == "eval":
             file6 = open(f"{stockSymbol}_EvaluationLog.txt", "w")
             file6.write("")
             file6.close()
+            removeSegments(f"{stockSymbol}_EvaluationLog.txt")
             print(f"Starting evaluation for {stockSymbol}")
             logging.info(f"Starting evaluation for {stockSymbol}")
             try:
@@ -185,14 +431,16 @@ class Main:
             except ImportError as e:
                 print("Required dependencies are missing. Please install packages from requirements.txt and try again.")
                 logging.error(f"Import failed for Evaluater: {e}")
-                os._exit(1)
-            evaluator = Evaluater(stockSymbol)
+                self.exit(1)
+            evaluator = Evaluater(stockSymbol, metricsPort=args.metrics_port, workers=args.workers, config=self.config)
             evaluator.start()
             # After evaluation completes, run the analyzer unless explicitly disabled
             if not args.no_analyze:
                 try:
                     import subprocess
                     analyze_cmd = ["python3", "tools/Analyze.py", "--stock", stockSymbol, "--top", "10", "--csv", f"{stockSymbol}_Analysis.csv", "--compare-totals"]
+                    if self.config.RESULTS_DB:
+                        analyze_cmd += ["--db", self.config.RESULTS_DB]
                     logging.info(f"Running analyzer: {' '.join(analyze_cmd)}")
                     proc = subprocess.run(analyze_cmd, capture_output=True, text=True)
                     logging.info(f"Analyzer stdout:\n{proc.stdout}")
@@ -211,8 +459,7 @@ class Main:
             file8 = open("RunnerDays.txt", "w")
             file8.write(str(args.days))
             file8.close()
-            print(f"Runner mode not yet implemented (would run for {args.days} days)")
-            logging.info(f"Runner mode requested but not implemented")
+            self.runLive(stockSymbol, args.days, args.record, args.replay, args.speed)
             # runner = Runner(stockSymbol, args.days)
             # runner.start()
 
@@ -0,0 +1,130 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from Config import CLEAN_NAN_POLICY, CLEAN_SESSION_HOURS, CLEAN_OUTLIER_MADS, CLEAN_OUTLIER_WINDOW
+
+log = logging.getLogger(__name__)
+
+NS_PER_MINUTE = 60 * 10**9
+NS_PER_DAY = 1440 * NS_PER_MINUTE
+
+
+def warmupMask(rows, windows):
+    """(rows, windows) mask that is True once row r has at least w rows of history for window w."""
+    return np.arange(rows)[:, None] >= np.asarray(windows)[None, :] - 1
+
+
+def sessionMinute(spec):
+    hours, minutes = spec.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+class CleanSeries:
+    """Output of PriceCleaner: a contiguous float64 price array with no NaNs.
+
+    times:     tz-naive int64 nanosecond timestamps (exchange wall clock)
+    prices:    cleaned closes, finite everywhere
+    observed:  True where the price is a real print, False where it was carried
+               forward over a NaN or a missing bar
+    """
+
+    def __init__(self, times, prices, observed, stats):
+        self.times = times
+        self.prices = prices
+        self.observed = observed
+        self.stats = stats
+
+    def index(self):
+        return pd.DatetimeIndex(self.times.astype("datetime64[ns]"))
+
+
+class PriceCleaner:
+    """One-time vectorized cleaning stage applied right after an intraday fetch.
+
+    Stages, each a handful of whole-array operations:
+      1. session mask: drop ticks outside sessionHours ("HH:MM", "HH:MM"), if set
+      2. NaN policy:   'ffill' carries the last valid price forward within the
+                       session and fills missing bars on the regular bar grid;
+                       'drop' removes NaN ticks. Leading NaNs of a session have
+                       nothing to carry and are always dropped.
+      3. outliers:     prices further than outlierMads scaled MADs from the
+                       trailing outlierWindow-tick median are clipped to that
+                       band (0 = disabled); the trailing window avoids lookahead.
+    """
+
+    def __init__(self, nanPolicy=CLEAN_NAN_POLICY, sessionHours=CLEAN_SESSION_HOURS,
+                 outlierMads=CLEAN_OUTLIER_MADS, outlierWindow=CLEAN_OUTLIER_WINDOW):
+        if nanPolicy not in ("ffill", "drop"):
+            raise ValueError(f"Unknown NaN policy '{nanPolicy}' (expected 'ffill' or 'drop')")
+        self.nanPolicy = nanPolicy
+        self.sessionHours = sessionHours
+        self.outlierMads = outlierMads
+        self.outlierWindow = outlierWindow
+
+    def clean(self, index, prices):
+        """Clean closes indexed by a DatetimeIndex; returns a CleanSeries."""
+        index = pd.DatetimeIndex(index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        times = index.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        stats = {"raw": len(prices)}
+
+        if self.sessionHours:
+            openMinute, closeMinute = (sessionMinute(spec) for spec in self.sessionHours)
+            minute = (times % NS_PER_DAY) // NS_PER_MINUTE
+            inSession = (minute >= openMinute) & (minute < closeMinute)
+            stats["outside_session"] = int((~inSession).sum())
+            times, prices = times[inSession], prices[inSession]
+
+        valid = ~np.isnan(prices)
+        stats["nan"] = int((~valid).sum())
+        day = times // NS_PER_DAY
+        if self.nanPolicy == "ffill" and len(prices):
+            # index of the last valid tick at or before each tick, limited to its own session
+            sessionStart = np.flatnonzero(np.append(True, day[1:] != day[:-1]))
+            firstOfSession = np.repeat(sessionStart, np.diff(np.append(sessionStart, len(day))))
+            lastValid = np.maximum.accumulate(np.where(valid, np.arange(len(prices)), -1))
+            keep = lastValid >= firstOfSession
+            observed = valid[keep]
+            times, prices, day = times[keep], prices[lastValid[keep]], day[keep]
+            times, prices, observed = self.fillGaps(times, prices, observed, day, stats)
+        else:
+            times, prices = times[valid], prices[valid]
+            observed = np.ones(len(prices), dtype=bool)
+
+        if self.outlierMads > 0 and len(prices):
+            series = pd.Series(prices)
+            median = series.rolling(self.outlierWindow, min_periods=1).median()
+            mad = (series - median).abs().rolling(self.outlierWindow, min_periods=1).median()
+            band = (self.outlierMads * 1.4826 * mad).to_numpy()
+            clipped = np.clip(prices, median.to_numpy() - band, median.to_numpy() + band)
+            clipped[band == 0] = prices[band == 0]  # flat stretches carry no scale information
+            stats["clipped"] = int((clipped != prices).sum())
+            prices = clipped
+
+        stats["clean"] = len(prices)
+        log.info("Cleaned intraday series: " + ", ".join(f"{name}={count}" for name, count in stats.items()))
+        return CleanSeries(times, np.ascontiguousarray(prices), observed, stats)
+
+    @staticmethod
+    def fillGaps(times, prices, observed, day, stats):
+        """Repeat the last price over missing bars inside a session, on the most common bar spacing."""
+        sameSession = day[1:] == day[:-1]
+        steps = np.diff(times)[sameSession]
+        steps = steps[steps > 0]
+        if len(steps) == 0:
+            stats["gap_bars"] = 0
+            return times, prices, observed
+        values, counts = np.unique(steps, return_counts=True)
+        step = int(values[counts.argmax()])
+        span = np.append(np.where(sameSession, np.diff(times), step), step)
+        repeats = np.maximum(span // step, 1)
+        stats["gap_bars"] = int(repeats.sum() - len(repeats))
+        if stats["gap_bars"] == 0:
+            return times, prices, observed
+        offsets = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        filledObserved = np.repeat(observed, repeats) & (offsets == 0)
+        return np.repeat(times, repeats) + offsets * step, np.repeat(prices, repeats), filledObserved
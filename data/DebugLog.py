@@ -0,0 +1,143 @@
+import atexit
+import logging
+import multiprocessing
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+from Config import LOG_LEVELS
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """QueueHandler that enqueues records untouched.
+
+    The stock QueueHandler formats every record in the calling thread so it
+    can be pickled; our queue never leaves the process, so formatting is left
+    entirely to the listener thread and the hot loop only pays for an enqueue.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class _PipeQueueHandler(QueueHandler):
+    """QueueHandler for pool workers: formats records (so they pickle) and puts them on a SimpleQueue."""
+
+    def enqueue(self, record):
+        self.queue.put(record)
+
+
+class _PipeQueueListener(QueueListener):
+    """QueueListener draining a multiprocessing.SimpleQueue fed by pool workers.
+
+    SimpleQueue.put writes to the pipe synchronously, so records logged by a
+    worker are not lost when its pool is terminated right after the last task.
+    """
+
+    def dequeue(self, block):
+        return self.queue.get()
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+_listener = None
+_workerListener = None
+_levels = {}
+
+
+def parseLevels(specs):
+    """Parse CLI level specs into {logger name: level}.
+
+    Each spec is either 'LEVEL' (root logger) or 'name=LEVEL', e.g.
+    ['INFO', 'data.StockUpdater=DEBUG', 'yfinance=WARNING'].
+    """
+    levels = {}
+    for spec in specs or []:
+        name, sep, level = spec.rpartition("=")
+        name = name if sep else "root"
+        level = level.strip().upper()
+        if not isinstance(logging.getLevelName(level), int):
+            raise ValueError(f"Unknown log level '{level}' in '{spec}'")
+        levels[name.strip() or "root"] = level
+    return levels
+
+
+def configureLogging(filename="Debug.log", levels=None):
+    """Route all logging through a background QueueListener writing to filename.
+
+    levels maps logger names ('root' for the root logger) to level names and is
+    applied on top of Config.LOG_LEVELS. Call stopLogging() (also registered
+    with atexit) to flush the queue before the process exits.
+    """
+    global _listener
+    if _listener is not None:
+        stopLogging()
+
+    fileHandler = logging.FileHandler(filename, mode="w")
+    fileHandler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    logQueue = queue.SimpleQueue()
+    _listener = QueueListener(logQueue, fileHandler, respect_handler_level=False)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_InProcessQueueHandler(logQueue))
+
+    merged = dict(LOG_LEVELS)
+    merged.update(levels or {})
+    applyLevels(merged)
+    _levels.clear()
+    _levels.update(merged)
+
+    _listener.start()
+    atexit.register(stopLogging)
+    return _listener
+
+
+def applyLevels(levels):
+    for name, level in levels.items():
+        target = logging.getLogger() if name == "root" else logging.getLogger(name)
+        target.setLevel(level.upper())
+
+
+def workerLogging():
+    """Spec passed to attachWorkerLogging by pool initializers, or None when Debug.log is not configured.
+
+    Worker processes cannot use the in-process queue (nothing drains it in
+    the child), so their records travel over a multiprocessing queue that a
+    second listener in this process writes to the same Debug.log.
+    """
+    global _workerListener
+    if _listener is None:
+        return None
+    if _workerListener is None:
+        _workerListener = _PipeQueueListener(multiprocessing.SimpleQueue(), *_listener.handlers, respect_handler_level=False)
+        _workerListener.start()
+    return _workerListener.queue, dict(_levels)
+
+
+def attachWorkerLogging(spec):
+    """In a pool worker: send every record to the parent's Debug.log (spec from workerLogging)."""
+    if spec is None:
+        return
+    logQueue, levels = spec
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_PipeQueueHandler(logQueue))
+    applyLevels(levels)
+
+
+def stopLogging():
+    """Flush queued records to disk and stop the background writers (idempotent)."""
+    global _listener, _workerListener
+    if _listener is None:
+        return
+    listener = _listener
+    _listener = None
+    if _workerListener is not None:
+        _workerListener.stop()
+        _workerListener = None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
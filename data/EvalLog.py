@@ -0,0 +1,142 @@
+import glob
+import gzip
+import io
+import logging
+import os
+import re
+import shutil
+
+log = logging.getLogger(__name__)
+
+# Finished segments of AMZN_EvaluationLog.txt are AMZN_EvaluationLog.00001.txt[.gz|.zst],
+# numbered in the order they were rotated out; the active file is always the newest part.
+SEGMENT_DIGITS = 5
+SUFFIXES = {"gzip": ".gz", "zstd": ".zst", "": ""}
+
+
+def zstdModule():
+    """The zstd implementation available here (stdlib compression.zstd or the zstandard package), else None."""
+    try:
+        from compression import zstd  # Python >= 3.14
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+def segmentPattern(path):
+    base, extension = os.path.splitext(path)
+    return re.compile(re.escape(base) + r"\.(\d{" + str(SEGMENT_DIGITS) + r"})" + re.escape(extension) + r"(\.gz|\.zst)?$")
+
+
+def segmentPaths(path):
+    """Finished segments of an evaluation log, oldest first (one path per segment number).
+
+    A segment interrupted while being compressed can exist both plain and
+    compressed; the plain copy is complete in that case and is preferred.
+    """
+    base, extension = os.path.splitext(path)
+    pattern = segmentPattern(path)
+    segments = {}
+    for candidate in glob.glob(glob.escape(base) + ".*" + extension + "*"):
+        m = pattern.match(candidate)
+        if not m:
+            continue
+        number = int(m.group(1))
+        if number not in segments or not m.group(2):
+            segments[number] = candidate
+    return [segments[number] for number in sorted(segments)]
+
+
+def logPaths(path):
+    """Every part of an evaluation log in order: finished segments, then the active file."""
+    paths = segmentPaths(path)
+    if os.path.exists(path):
+        paths.append(path)
+    return paths
+
+
+def openText(path):
+    """Open one log part for reading as text, decompressing by extension."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".zst"):
+        zstd = zstdModule()
+        if zstd is None:
+            raise ImportError(f"Reading {path} needs zstd support (Python 3.14+ or the zstandard package)")
+        return zstd.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def readLines(path):
+    """Stream the lines of an evaluation log across its rotated segments, one part open at a time.
+
+    Raises FileNotFoundError when neither the active file nor any segment exists.
+    """
+    paths = logPaths(path)
+    if not paths:
+        raise FileNotFoundError(path)
+    for part in paths:
+        with openText(part) as fh:
+            for line in fh:
+                yield line
+
+
+def compressFile(source, target, compression):
+    """Compress source into target via a temporary file, so target only ever appears complete."""
+    temporary = target + ".tmp"
+    with open(source, "rb") as src:
+        if compression == "zstd":
+            with zstdModule().open(temporary, "wb") as dst:
+                shutil.copyfileobj(src, dst, io.DEFAULT_BUFFER_SIZE * 64)
+        else:
+            with gzip.open(temporary, "wb") as dst:
+                shutil.copyfileobj(src, dst, io.DEFAULT_BUFFER_SIZE * 64)
+    os.replace(temporary, target)
+
+
+def rotate(path, compression="gzip"):
+    """Move the active log to the next segment number and compress it. Returns the segment path.
+
+    compression is 'gzip', 'zstd' or '' (keep segments as plain text); 'zstd'
+    falls back to gzip when no zstd implementation is installed.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    if compression not in SUFFIXES:
+        raise ValueError(f"Unknown EVALLOG_COMPRESS '{compression}' (expected 'gzip', 'zstd' or '')")
+    if compression == "zstd" and zstdModule() is None:
+        log.warning("zstd support not installed; compressing evaluation log segments with gzip")
+        compression = "gzip"
+
+    existing = segmentPaths(path)
+    number = int(segmentPattern(path).match(existing[-1]).group(1)) + 1 if existing else 1
+    base, extension = os.path.splitext(path)
+    plain = f"{base}.{number:0{SEGMENT_DIGITS}d}{extension}"
+    os.replace(path, plain)
+    if not compression:
+        log.info(f"Rotated {path} to {plain}")
+        return plain
+    segment = plain + SUFFIXES[compression]
+    compressFile(plain, segment, compression)
+    os.remove(plain)
+    log.info(f"Rotated {path} to {segment}")
+    return segment
+
+
+def removeSegments(path):
+    """Delete every finished segment of an evaluation log (the active file is left alone). Returns the removed paths."""
+    removed = segmentPaths(path)
+    base, extension = os.path.splitext(path)
+    pattern = segmentPattern(path)
+    for candidate in glob.glob(glob.escape(base) + ".*" + extension + "*"):
+        # plain leftovers and .tmp files of interrupted compressions go too
+        if candidate not in removed and pattern.match(candidate.removesuffix(".tmp")):
+            removed.append(candidate)
+    for segment in removed:
+        os.remove(segment)
+    return removed
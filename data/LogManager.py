@@ -1,18 +1,87 @@
+import logging
+import os
+
 from numpy import double
 
+from EvalConfig import EvalConfig
+from data import EvalLog
+from data.ResultStore import ResultStore, newRunId
+
+log = logging.getLogger(__name__)
+
 
 class LogManager:
-    """File-based logger for evaluation and run outputs per stock."""
+    """File-based logger for evaluation and run outputs per stock.
+
+    Daily totals are also staged in memory and written to the results store
+    (config.RESULTS_DB) in one transaction per day via commitDailyTotals.
+    The EvaluationLog is rotated into compressed segments by size
+    (EVALLOG_ROTATE_MB) or day count (EVALLOG_ROTATE_DAYS); see data/EvalLog.py.
+    """
 
     stock = ""
 
-    def __init__(self, stock):
+    def __init__(self, stock, config=None):
         self.stock = stock
+        self.config = config or EvalConfig.fromConfig()
+        self.pendingTotals = []
+        self.resultStore = None
+        self.runId = None
+        self.evalLogPath = stock + "_EvaluationLog.txt"
+        self.rotateBytes = int(self.config.EVALLOG_ROTATE_MB * 1024 * 1024)
+        if self.config.RESULTS_DB:
+            try:
+                self.runId = self.currentRunId()
+                self.resultStore = ResultStore(self.config.RESULTS_DB)
+                self.resultStore.beginRun(self.runId, stock, self.config)
+            except Exception as e:
+                log.error(f"Results store unavailable ({self.config.RESULTS_DB}): {e}")
+                self.resultStore = None
+
+    @staticmethod
+    def currentRunId():
+        """Read the session run id from RunId.txt, creating one if missing."""
+        if os.path.exists("RunId.txt"):
+            with open("RunId.txt", "r") as f:
+                runId = f.readline().strip()
+            if runId != "":
+                return runId
+        runId = newRunId()
+        with open("RunId.txt", "w") as f:
+            f.write(runId)
+        return runId
 
     def appendToEvalLog(self, message):
-        file = open(self.stock + "_EvaluationLog.txt", "a")
+        file = open(self.evalLogPath, "a")
         file.write(message + "\n")
+        size = file.tell()
         file.close()
+        if self.rotateBytes and size >= self.rotateBytes:
+            self.rotateEvalLog()
+
+    def appendLinesToEvalLog(self, messages):
+        """Append many lines with a single open/write (used when merging parallel workers)."""
+        if not messages:
+            return
+        file = open(self.evalLogPath, "a")
+        file.write("\n".join(messages) + "\n")
+        size = file.tell()
+        file.close()
+        if self.rotateBytes and size >= self.rotateBytes:
+            self.rotateEvalLog()
+
+    def rotateEvalLog(self):
+        """Close out the active EvaluationLog as the next compressed segment; appends start a new file."""
+        try:
+            EvalLog.rotate(self.evalLogPath, self.config.EVALLOG_COMPRESS)
+        except Exception as e:
+            # a failed rotation keeps appending to the active file
+            log.error(f"EvaluationLog rotation failed: {e}")
+
+    def endEvalDay(self, day):
+        """Rotate the EvaluationLog after every EVALLOG_ROTATE_DAYS evaluated days."""
+        if self.config.EVALLOG_ROTATE_DAYS and day % self.config.EVALLOG_ROTATE_DAYS == 0:
+            self.rotateEvalLog()
 
     def appendToRunLog(self, message):
         file = open(self.stock + "_RunnerLog.txt", "a")
@@ -29,12 +98,31 @@ class LogManager:
         file.write("")
         file.close()
 
-    def giveEvalReport(self, days, profit):
+    def giveEvalReport(self, days, profit, prunedDay=None):
         daysStr = str(days)
         profitStr = str(profit)
+        if prunedDay is not None:
+            # pruned bots keep their partial total, marked so resume and Analyze.py can tell
+            self.appendToTotals(f"SMA {daysStr}: {profitStr} [pruned day {prunedDay}]")
+            self.pendingTotals.append((days, profit))
+            return
         print(f"SMA {daysStr} finished today with {profitStr} in profit.")
         self.appendToEvalLog(f"SMA {daysStr} finished today with {profitStr} in profit.")
         self.appendToTotals(f"SMA {daysStr}: {profitStr}")
+        self.pendingTotals.append((days, profit))
+
+    def stageTotal(self, days, profit):
+        """Stage a total for the results store without writing to the text logs."""
+        self.pendingTotals.append((days, profit))
+
+    def commitDailyTotals(self, day):
+        """Write all staged totals for the given day to the results store in one transaction."""
+        if self.resultStore is not None and self.pendingTotals:
+            try:
+                self.resultStore.writeDailyTotals(self.runId, self.stock, day, self.pendingTotals)
+            except Exception as e:
+                log.error(f"Failed writing daily totals to results store: {e}")
+        self.pendingTotals = []
 
     def giveRunnerReport(self, days, profit):
         daysStr = str(days)
@@ -49,8 +137,11 @@ class LogManager:
         while smaLine != "":
             if str("SMA " + str(sma.days)) in smaLine:
                 parts = smaLine.split(": ")
-                value = double(parts[1])
+                fields = parts[1].split(" ", 1)
+                value = double(fields[0])
                 sma.totalProfit = value
+                if len(fields) > 1 and "pruned day" in fields[1]:
+                    sma.prunedDay = int(fields[1].strip(" []\n").split()[-1])
                 # print(str("SMA Value: " + str(value)))
                 break
             else:
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+from Config import CACHE_DIR, CACHE_MAX_MB
+
+log = logging.getLogger(__name__)
+
+
+def contentKey(*parts):
+    """Hash arrays (dtype, shape and bytes) and JSON-serializable values into a cache key."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            part = np.ascontiguousarray(part)
+            digest.update(f"{part.dtype.str}{part.shape}".encode("utf-8"))
+            digest.update(part.tobytes())
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:32]
+
+
+class ResultCache:
+    """Content-addressed on-disk cache of per-window arrays (SMA columns, backtest results).
+
+    Entries are .npz files named <kind>-<key>.npz, where the key hashes every
+    input the values depend on. Each entry holds a 'windows' array plus
+    named arrays whose last axis runs over those windows, so a request for
+    a different window range only computes the windows not cached yet and
+    merges them into the entry. Reading an entry refreshes its mtime; the
+    least recently used entries are deleted once the directory exceeds
+    maxMb megabytes. The directory is created by the first store, and
+    several processes may share it.
+    """
+
+    def __init__(self, directory=CACHE_DIR, maxMb=CACHE_MAX_MB):
+        self.directory = directory
+        self.maxBytes = int(maxMb * 1024 * 1024)
+
+    def path(self, kind, key):
+        return os.path.join(self.directory, f"{kind}-{key}.npz")
+
+    def load(self, kind, key):
+        """Return the entry's arrays as a dict, or None on a miss."""
+        path = self.path(kind, key)
+        try:
+            with np.load(path) as entry:
+                arrays = {name: entry[name] for name in entry.files}
+        except (OSError, ValueError) as e:
+            if os.path.exists(path):
+                log.warning(f"Discarding unreadable cache entry {path}: {e}")
+                os.remove(path)
+            return None
+        os.utime(path)  # mark as recently used
+        return arrays
+
+    def store(self, kind, key, arrays):
+        """Write an entry atomically, then evict least recently used entries over the size limit."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(kind, key)
+        # unique per writer, so processes sharing the directory never write the same temp file
+        tmpPath = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmpPath, **arrays)
+        os.replace(tmpPath, path)
+        self.evict(keep=path)
+
+    def evict(self, keep=None):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".npz") or ".tmp" in name:
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.maxBytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # already evicted by another process
+                continue
+            total -= size
+            log.info(f"Evicted cache entry {path}")
+
+    def windowColumns(self, kind, key, windows, compute):
+        """Return {name: array} for windows, computing and caching only the missing ones.
+
+        compute(missingWindows) must return {name: array} with the window axis
+        last; cached and new columns are merged and returned in windows order.
+        """
+        windows = np.asarray(windows, dtype=np.int64)
+        entry = self.load(kind, key)
+        cachedWindows = entry.pop("windows") if entry is not None else np.zeros(0, dtype=np.int64)
+        missing = np.setdiff1d(windows, cachedWindows)
+        if len(missing):
+            log.info(f"Cache {kind}: computing {len(missing)} of {len(windows)} windows")
+            fresh = compute(missing)
+            if entry is None:
+                allWindows, entry = missing, fresh
+            else:
+                allWindows = np.concatenate((cachedWindows, missing))
+                entry = {name: np.concatenate((entry[name], fresh[name]), axis=-1) for name in fresh}
+            order = np.argsort(allWindows, kind="stable")
+            allWindows = allWindows[order]
+            entry = {name: values[..., order] for name, values in entry.items()}
+            self.store(kind, key, dict(entry, windows=allWindows))
+        else:
+            log.info(f"Cache {kind}: all {len(windows)} windows cached")
+            allWindows = cachedWindows
+        idx = np.searchsorted(allWindows, windows)
+        return {name: values[..., idx] for name, values in entry.items()}
@@ -0,0 +1,131 @@
+import json
+import logging
+import sqlite3
+import time
+import uuid
+
+from EvalConfig import EvalConfig
+
+log = logging.getLogger(__name__)
+
+
+def configFingerprint(config=None):
+    """Return (fingerprint, config dict) for the evaluation-relevant values of config (default: Config.py)."""
+    config = config or EvalConfig.fromConfig()
+    return config.fingerprint(), config.fingerprintValues()
+
+
+def newRunId():
+    """Generate a sortable, unique run id (UTC timestamp + random suffix)."""
+    return time.strftime("%Y%m%dT%H%M%S", time.gmtime()) + "-" + uuid.uuid4().hex[:8]
+
+
+class ResultStore:
+    """SQLite (WAL mode) warehouse for per-window outcomes across runs and symbols.
+
+    runs:          one row per evaluation run (run id, symbol, config fingerprint)
+    window_results: aggregated trades/total/wins per (run, symbol, window), written by Analyze.py
+    daily_totals:  running total per (run, symbol, window, day), written by LogManager
+
+    All writes are batched into a single transaction per call.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id      TEXT PRIMARY KEY,
+            symbol      TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            config      TEXT NOT NULL,
+            started_at  REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS window_results (
+            run_id TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            sma    INTEGER NOT NULL,
+            trades INTEGER NOT NULL,
+            total  REAL NOT NULL,
+            wins   INTEGER NOT NULL,
+            PRIMARY KEY (run_id, symbol, sma)
+        );
+        CREATE TABLE IF NOT EXISTS daily_totals (
+            run_id TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            sma    INTEGER NOT NULL,
+            day    INTEGER NOT NULL,
+            total  REAL NOT NULL,
+            PRIMARY KEY (run_id, symbol, sma, day)
+        );
+        CREATE INDEX IF NOT EXISTS idx_runs_symbol_started ON runs (symbol, started_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_runs_fingerprint ON runs (fingerprint);
+        CREATE INDEX IF NOT EXISTS idx_window_symbol_total ON window_results (symbol, total DESC);
+        CREATE INDEX IF NOT EXISTS idx_window_total ON window_results (total DESC);
+        CREATE INDEX IF NOT EXISTS idx_daily_symbol_window ON daily_totals (symbol, sma, day);
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def beginRun(self, runId, symbol, config=None):
+        """Register a run (idempotent, so resumed sessions keep their original row)."""
+        fingerprint, values = configFingerprint(config)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, symbol, fingerprint, config, started_at) VALUES (?, ?, ?, ?, ?)",
+                (runId, symbol, fingerprint, json.dumps(values, sort_keys=True), time.time()),
+            )
+        log.info(f"Results store run {runId} registered for {symbol} (config {fingerprint})")
+
+    def writeDailyTotals(self, runId, symbol, day, totals):
+        """Bulk-insert (window, total) pairs for one day in a single transaction."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO daily_totals (run_id, symbol, sma, day, total) VALUES (?, ?, ?, ?, ?)",
+                [(runId, symbol, int(window), int(day), float(total)) for window, total in totals],
+            )
+
+    def writeWindowResults(self, runId, symbol, perWindow):
+        """Bulk-insert aggregated stats; perWindow maps window -> {'count', 'total', 'positive'}."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO window_results (run_id, symbol, sma, trades, total, wins) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (runId, symbol, int(window), int(stats['count']), float(stats['total']), int(stats['positive']))
+                    for window, stats in perWindow.items()
+                ],
+            )
+
+    def bestWindows(self, symbol, lastRuns=5, limit=10):
+        """Best windows for a symbol averaged over its most recent runs.
+
+        Returns rows of (window, avg_total, best_total, runs, trades, wins).
+        """
+        return self.conn.execute(
+            """
+            SELECT sma, AVG(total), MAX(total), COUNT(*), SUM(trades), SUM(wins)
+            FROM window_results
+            WHERE symbol = ? AND run_id IN (
+                SELECT run_id FROM runs WHERE symbol = ? ORDER BY started_at DESC LIMIT ?
+            )
+            GROUP BY sma
+            ORDER BY AVG(total) DESC
+            LIMIT ?
+            """,
+            (symbol, symbol, lastRuns, limit),
+        ).fetchall()
+
+    def topWindows(self, limit=10):
+        """Top (symbol, window) results across the whole universe.
+
+        Returns rows of (symbol, window, total, trades, wins, run_id).
+        """
+        return self.conn.execute(
+            "SELECT symbol, sma, total, trades, wins, run_id FROM window_results ORDER BY total DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
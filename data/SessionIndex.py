@@ -0,0 +1,83 @@
+import logging
+
+import numpy as np
+
+from data.Cleaner import NS_PER_DAY, NS_PER_MINUTE, sessionMinute
+
+log = logging.getLogger(__name__)
+
+
+EXTENDED_PARTS = ("pre", "post")
+
+
+class SessionIndex:
+    """Trading-calendar index over one cleaned intraday download, built once per fetch.
+
+    times are the tz-naive int64 nanosecond exchange timestamps of the ticks
+    (CleanSeries.times) and dailyDates the dates of the daily rows the SMA
+    matrix was computed from. Every calendar date with ticks is a session:
+        dates:      (sessions,) datetime64[D] session dates
+        dayStarts:  (sessions + 1,) tick offsets; session d is ticks dayStarts[d]:dayStarts[d + 1]
+        dailyRows:  (sessions,) daily row whose SMA marks are known at the session's open,
+                    i.e. the last daily row dated before the session (-1 if none)
+    and every tick is flagged against sessionHours ("HH:MM", "HH:MM"):
+        regular:    inside the regular session
+        premarket:  before the open (extended hours)
+        postmarket: at or after the close (extended hours)
+    Without sessionHours every tick counts as regular.
+
+    extended names the extended-hours parts that are traded ('pre', 'post').
+    Pre-market ticks open a session and post-market ticks close it, so
+    excluding them narrows each session's tick range (ticks()); traded masks
+    the ticks that remain and tradedStarts delimits the sessions in
+    prices[traded].
+    """
+
+    def __init__(self, times, dailyDates, sessionHours=None, extended=EXTENDED_PARTS):
+        unknown = sorted(set(extended) - set(EXTENDED_PARTS))
+        if unknown:
+            raise ValueError(f"Unknown extended-hours part(s) {', '.join(unknown)} (expected 'pre' and/or 'post')")
+        times = np.asarray(times, dtype=np.int64)
+        day = times // NS_PER_DAY
+        boundaries = np.flatnonzero(day[1:] != day[:-1]) + 1
+        self.dayStarts = np.concatenate(([0], boundaries, [len(times)])).astype(np.int64)
+        if len(times) == 0:
+            self.dayStarts = np.zeros(1, dtype=np.int64)
+        self.dates = day[self.dayStarts[:-1]].astype("datetime64[D]")
+
+        dailyDates = np.asarray(dailyDates, dtype="datetime64[D]")
+        self.dailyRows = (np.searchsorted(dailyDates, self.dates, side="left") - 1).astype(np.int64)
+
+        minute = (times % NS_PER_DAY) // NS_PER_MINUTE
+        if sessionHours:
+            openMinute, closeMinute = (sessionMinute(spec) for spec in sessionHours)
+            self.premarket = minute < openMinute
+            self.postmarket = minute >= closeMinute
+        else:
+            self.premarket = np.zeros(len(times), dtype=bool)
+            self.postmarket = np.zeros(len(times), dtype=bool)
+        self.regular = ~(self.premarket | self.postmarket)
+
+        self.traded = self.regular.copy()
+        sessionOf = np.repeat(np.arange(self.count), np.diff(self.dayStarts))
+        self.tradeStarts = self.dayStarts[:-1].copy()
+        self.tradeEnds = self.dayStarts[1:].copy()
+        if "pre" in extended:
+            self.traded |= self.premarket
+        else:
+            self.tradeStarts += np.bincount(sessionOf[self.premarket], minlength=self.count)
+        if "post" in extended:
+            self.traded |= self.postmarket
+        else:
+            self.tradeEnds -= np.bincount(sessionOf[self.postmarket], minlength=self.count)
+        self.tradedStarts = np.concatenate(([0], np.cumsum(self.tradeEnds - self.tradeStarts))).astype(np.int64)
+        log.info(f"Session index: {self.count} sessions, {int(self.regular.sum())} regular and "
+                 f"{int((~self.regular).sum())} extended-hours ticks, {int((~self.traded).sum())} not traded")
+
+    @property
+    def count(self):
+        return len(self.dates)
+
+    def ticks(self, session):
+        """(start, end) range of the traded ticks of a session."""
+        return int(self.tradeStarts[session]), int(self.tradeEnds[session])
@@ -3,48 +3,120 @@ import os
 import logging
 import time
 
+import numpy as np
 import pandas as pd
 import yfinance as yf
 
-from Config import SMA_MIN, SMA_MAX, SMA_STEP, EVAL_DAYS, LOG_PRICE_INTERVAL, LOG_INDEX_INTERVAL, EVAL_INTRADAY_INTERVAL
+from EvalConfig import EvalConfig
+from data.Cleaner import PriceCleaner, warmupMask
+from data.ResultCache import ResultCache, contentKey
+from data.SessionIndex import SessionIndex
+from data.Storage import MatrixStorage
+
+log = logging.getLogger(__name__)
+
+
+def intervalMinutes(interval):
+    """Length in minutes of a yfinance intraday interval such as '2m' or '1h'."""
+    unit = interval[-1:]
+    try:
+        value = int(interval[:-1])
+    except ValueError:
+        value = 0
+    if value <= 0 or unit not in ("m", "h"):
+        raise ValueError(f"Unsupported intraday interval '{interval}'")
+    return value * 60 if unit == "h" else value
+
+
+def resampleSessions(times, prices, dayStarts, minutes):
+    """Downsample intraday closes to bars of minutes, never crossing a session boundary.
+
+    times holds the tz-naive int64 nanosecond timestamps of prices. Bars are
+    aligned to each session's first tick and close at the last valid (non-NaN)
+    price inside them. Returns (barPrices, barDayStarts, sessions) where
+    sessions maps every bar session back to its index in dayStarts (sessions
+    without any valid price are dropped).
+    """
+    valid = ~np.isnan(prices)
+    if not valid.any():
+        return np.zeros(0), np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    session = np.repeat(np.arange(len(dayStarts) - 1), np.diff(dayStarts))
+    # sessions without ticks own no entries of session, so clipping their start is harmless
+    firstTimes = times[np.minimum(dayStarts[:-1], len(times) - 1)]
+    bucket = (times - firstTimes[session]) // (minutes * 60 * 10**9)
+    session, bucket, closes = session[valid], bucket[valid], prices[valid]
+    barEnds = np.flatnonzero(np.append((session[1:] != session[:-1]) | (bucket[1:] != bucket[:-1]), True))
+    barSession = session[barEnds]
+    starts = np.flatnonzero(np.append(True, barSession[1:] != barSession[:-1]))
+    barDayStarts = np.append(starts, len(barEnds)).astype(np.int64)
+    return closes[barEnds], barDayStarts, barSession[starts]
 
 
 class StockUpdater:
     """Provides methods to update price and SMA data via yfinance.
 
-    historicalUpdate: updates intra-day price for evaluation simulation across days.
-    liveUpdate: grabs the latest 1m close price and writes to Price.txt.
+    historicalUpdate: serves the current evaluation day's intraday session tick by tick.
+    liveUpdate: grabs the latest 1m close price (or the next replayed tick) and writes to Price.txt.
     smaUpdate: computes rolling SMAs (1..200) from daily close data and writes snapshot to SMA.txt.
+
+    Windows, evaluation period, cleaning and cache settings come from config
+    (an EvalConfig, default: the values in Config.py). config.EVAL_STORAGE
+    selects how cachedIntradayPrices and cachedSmaMatrix are held in memory
+    (data.Storage.MatrixStorage); read prices back through storage.dollars().
     """
 
-    def __init__(self):
+    def __init__(self, telemetry=None, journal=None, tickSource=None, config=None):
+        self.config = config or EvalConfig.fromConfig()
+        self.storage = MatrixStorage(self.config.EVAL_STORAGE)
+        # Optional data.Telemetry.Telemetry receiving progress and fetch latency
+        self.telemetry = telemetry
+        # Optional data.TickJournal.TickJournal recording live ticks, and a
+        # JournalReplay feeding liveUpdate from a recording instead of yfinance
+        self.journal = journal
+        self.tickSource = tickSource
+        self.lastRecordedTimestamp = None
+        self.lastTickLatency = 0.0
+        # Content-addressed cache of SMA columns shared across runs (None = disabled)
+        self.cache = ResultCache(self.config.CACHE_DIR, self.config.CACHE_MAX_MB) if self.config.CACHE_DIR else None
+        self.dailyDataKey = None
+        self.sessionKey = None
         # Cache for downloaded data (logging unified via root logger in Main)
         self.cachedIntradayData = None
+        self.cachedIntradayTimes = None
+        self.cachedIntradayPrices = None
+        self.cachedIntradayObserved = None
         self.cachedDailyData = None
+        self.cachedSmaMatrix = None
+        self.cachedSmaValid = None
+        self.cachedSessions = None
         self.cachedSymbol = None
+        self.cachedInterval = None
         self.maxRetries = 3
         self.retryDelay = 3
 
-    def fetchWithRetries(self, stockSymbol, interval, startDate, endDate):
-        """Download data from yfinance with retry logic and error handling."""
+    def fetchWithRetries(self, stockSymbol, interval, startDate, endDate, prepost=False):
+        """Download data from yfinance with retry logic and error handling (prepost: include extended hours)."""
         for attempt in range(self.maxRetries):
             try:
-                logging.info(f"Fetching {stockSymbol} data (interval={interval}, start={startDate}, end={endDate}), attempt {attempt + 1}")
-                data = yf.download(stockSymbol, interval=interval, start=startDate, end=endDate, progress=False)
+                log.info(f"Fetching {stockSymbol} data (interval={interval}, start={startDate}, end={endDate}), attempt {attempt + 1}")
+                fetchStart = time.perf_counter()
+                data = yf.download(stockSymbol, interval=interval, start=startDate, end=endDate, prepost=prepost, progress=False)
+                if self.telemetry is not None:
+                    self.telemetry.observeFetch(time.perf_counter() - fetchStart)
                 
                 if data is None or data.empty:
-                    logging.warning(f"yfinance returned empty data for {stockSymbol}")
+                    log.warning(f"yfinance returned empty data for {stockSymbol}")
                     if attempt < self.maxRetries - 1:
                         time.sleep(self.retryDelay)
                         continue
                     else:
                         raise RuntimeError(f"No data returned for {stockSymbol} after {self.maxRetries} attempts")
                 
-                logging.info(f"Successfully fetched {len(data)} rows for {stockSymbol}")
+                log.info(f"Successfully fetched {len(data)} rows for {stockSymbol}")
                 return data
                 
             except Exception as e:
-                logging.error(f"Error fetching data (attempt {attempt + 1}/{self.maxRetries}): {e}")
+                log.error(f"Error fetching data (attempt {attempt + 1}/{self.maxRetries}): {e}")
                 if attempt < self.maxRetries - 1:
                     time.sleep(self.retryDelay)
                 else:
@@ -53,7 +125,11 @@ class StockUpdater:
         raise RuntimeError(f"Failed to fetch data after {self.maxRetries} attempts")
 
     def historicalUpdate(self):
-        """Updates intra-day price for evaluation simulation, with caching and error handling."""
+        """Updates intra-day price for evaluation simulation, with caching and error handling.
+
+        Evaluation day DayIndex replays its own session from the session
+        index, one tick per call (PriceIndex counts ticks within the day).
+        """
         try:
             stockSymbol = open("Stock.txt", "r").readline().strip()
 
@@ -62,208 +138,366 @@ class StockUpdater:
             file1.close()
             dateIndex = int(dateIndexRaw) - 1  # convert to 0-based
 
-            if dateIndex == EVAL_DAYS - 1:  # all days processed
+            evalDays = self.evaluationDays(stockSymbol)
+            if dateIndex >= evalDays:  # all days processed
                 file2 = open("Price.txt", "w")
                 file2.write("DONEALL")
                 file2.close()
-                logging.info("All evaluation days processed")
+                log.info("All evaluation days processed")
                 return  # let Evaluator.py handle the cleanup and exit
 
-            #assert 0 <= dateIndex <= EVAL_DAYS - 2
-
-            # Download all intraday data for evaluation period if not cached
-            if self.cachedIntradayData is None or self.cachedSymbol != stockSymbol:
-                logging.info(f"Caching intraday data for {stockSymbol}")
-                now = datetime.datetime.now()
-                evalEndDate = now.strftime("%Y-%m-%d")
-                evalStartDate = (now - datetime.timedelta(days=EVAL_DAYS - 1)).strftime("%Y-%m-%d")
-                
-                data = self.fetchWithRetries(stockSymbol, EVAL_INTRADAY_INTERVAL, evalStartDate, evalEndDate)
-                
-                if "Close" not in data.columns:
-                    logging.error(f"No 'Close' column in intraday data for {stockSymbol}. Columns: {data.columns.tolist()}")
-                    raise RuntimeError("No 'Close' column in downloaded data")
-                # Ensure we have a 1-D Series of close prices
-                close = data["Close"]
-                if isinstance(close, pd.DataFrame):
-                    # pick first column if multi-ticker structure sneaks in
-                    close = close.iloc[:, 0]
-                self.cachedIntradayData = close.reset_index(drop=True)
-                self.cachedSymbol = stockSymbol
-                self.cachedIntradayData.to_csv("StockData.csv")
-                logging.info(f"Cached {len(self.cachedIntradayData)} intraday data points")
-            
             # Get current price index
             fileHandle2 = open("PriceIndex.txt", "r")
             priceIndex = int(fileHandle2.readline()) - 1  # 0-based
             fileHandle2.close()
-            
-            maxIndex = len(self.cachedIntradayData) - 1
-            # Show indexing progress on console
-            print(f"maxIndex: {maxIndex}, priceIndex: {priceIndex}")
-            # Log index info based on config interval
-            if LOG_INDEX_INTERVAL > 0 and (priceIndex % LOG_INDEX_INTERVAL == 0 or priceIndex == 0 or priceIndex == maxIndex):
-                logging.debug(f"DayIndex={dateIndex}, PriceIndex={priceIndex}, MaxIndex={maxIndex}")
-            elif LOG_INDEX_INTERVAL == 0:
-                logging.debug(f"DayIndex={dateIndex}, PriceIndex={priceIndex}, MaxIndex={maxIndex}")
-
-            if priceIndex > maxIndex or maxIndex <= 0:  # finished the day's data or no data
+
+            dayStart, dayEnd = self.dayTicks(stockSymbol, dateIndex)
+            prices = self.cachedIntradayPrices
+            maxIndex = dayEnd - dayStart - 1
+            # Report progress (the console status line is throttled by Telemetry)
+            if self.telemetry is not None:
+                self.telemetry.setDay(dateIndex + 1, evalDays)
+                self.telemetry.setProgress((dateIndex + min(priceIndex, maxIndex + 1) / max(maxIndex + 1, 1)) / evalDays)
+            # Log index info based on config interval (skip formatting entirely when DEBUG is off)
+            debugEnabled = log.isEnabledFor(logging.DEBUG)
+            if debugEnabled and (self.config.LOG_INDEX_INTERVAL == 0 or priceIndex % self.config.LOG_INDEX_INTERVAL == 0 or priceIndex == 0 or priceIndex == maxIndex):
+                log.debug(f"DayIndex={dateIndex}, PriceIndex={priceIndex}, MaxIndex={maxIndex}")
+
+            if priceIndex > maxIndex:  # finished the day's session
                 file = open("Price.txt", "w")
                 file.write("DONE")
                 file.close()
-                logging.info("Day complete or no data available")
+                log.info("Day complete or no data available")
             else:
-                closePrice = self.cachedIntradayData.iloc[priceIndex]
-                # Normalize to a native float if possible
-                try:
-                    closeIsNaN = bool(pd.isna(closePrice))
-                except Exception:
-                    # pd.isna returned array-like; treat as invalid
-                    closeIsNaN = True
-                if closeIsNaN:
-                    logging.warning(f"NaN price at index {priceIndex}")
-                    file = open("Price.txt", "w")
-                    file.write("DONE")
-                    file.close()
-                else:
-                    # Write price as string
-                    file = open("Price.txt", "w")
-                    file.write(str(float(closePrice)))
-                    file.close()
-                    # Log price based on config interval
-                    if LOG_PRICE_INTERVAL > 0 and (priceIndex % LOG_PRICE_INTERVAL == 0 or priceIndex == 0 or priceIndex == maxIndex):
-                        logging.debug(f"Price at index {priceIndex}: {float(closePrice)}")
-                    elif LOG_PRICE_INTERVAL == 0:
-                        logging.debug(f"Price at index {priceIndex}: {float(closePrice)}")
+                # the cleaning stage guarantees every cached price is a finite float
+                closePrice = self.storage.dollars(prices[dayStart + priceIndex])
+                file = open("Price.txt", "w")
+                file.write(str(float(closePrice)))
+                file.close()
+                # Log price based on config interval
+                if debugEnabled and (self.config.LOG_PRICE_INTERVAL == 0 or priceIndex % self.config.LOG_PRICE_INTERVAL == 0 or priceIndex == 0 or priceIndex == maxIndex):
+                    log.debug(f"Price at index {priceIndex}: {float(closePrice)}")
 
-                    
         except Exception as e:
-            logging.error(f"historicalUpdate failed: {e}", exc_info=True)
+            log.error(f"historicalUpdate failed: {e}", exc_info=True)
             # Write DONE to prevent infinite loop
             file = open("Price.txt", "w")
             file.write("DONE")
             file.close()
             raise
 
+    def loadIntradayData(self, stockSymbol, interval=None):
+        """Download and clean intraday closes for the evaluation period once per symbol and interval (cached).
+
+        The download goes through data.Cleaner.PriceCleaner once, so
+        cachedIntradayPrices is a contiguous array without NaNs, stored as
+        float64, float32 or int64 cents per config.EVAL_STORAGE.
+        Its session timestamps are kept in cachedIntradayTimes so ticks can
+        be grouped back into trading days, and cachedIntradayObserved marks
+        real prints (False = carried forward by the cleaner).
+        """
+        interval = interval or self.config.EVAL_INTRADAY_INTERVAL
+        if self.cachedIntradayData is None or self.cachedSymbol != stockSymbol or self.cachedInterval != interval:
+            log.info(f"Caching intraday data for {stockSymbol}")
+            now = datetime.datetime.now()
+            evalEndDate = now.strftime("%Y-%m-%d")
+            evalStartDate = (now - datetime.timedelta(days=self.config.EVAL_DAYS - 1)).strftime("%Y-%m-%d")
+
+            data = self.fetchWithRetries(stockSymbol, interval, evalStartDate, evalEndDate, prepost=self.config.EVAL_EXTENDED_HOURS)
+
+            if "Close" not in data.columns:
+                log.error(f"No 'Close' column in intraday data for {stockSymbol}. Columns: {data.columns.tolist()}")
+                raise RuntimeError("No 'Close' column in downloaded data")
+            # Ensure we have a 1-D Series of close prices
+            close = data["Close"]
+            if isinstance(close, pd.DataFrame):
+                # pick first column if multi-ticker structure sneaks in
+                close = close.iloc[:, 0]
+            config = self.config
+            # with extended hours the session index flags pre/post-market ticks instead of the cleaner dropping them
+            keepHours = config.EXTENDED_SESSION_HOURS if config.EVAL_EXTENDED_HOURS else config.CLEAN_SESSION_HOURS
+            cleaner = PriceCleaner(config.CLEAN_NAN_POLICY, keepHours, config.CLEAN_OUTLIER_MADS, config.CLEAN_OUTLIER_WINDOW)
+            clean = cleaner.clean(close.index, close.to_numpy(dtype=np.float64))
+            self.cachedIntradayPrices = self.storage.packPrices(clean.prices)
+            self.cachedIntradayObserved = clean.observed
+            self.cachedIntradayTimes = clean.index()
+            # a view of the stored prices (in storage units); StockData.csv always holds dollars
+            self.cachedIntradayData = pd.Series(self.cachedIntradayPrices, copy=False)
+            self.cachedSessions = None  # rebuilt from the new timestamps on demand
+            self.cachedSymbol = stockSymbol
+            self.cachedInterval = interval
+            pd.Series(clean.prices).to_csv("StockData.csv")
+            log.info(f"Cached {len(self.cachedIntradayData)} intraday data points")
+        return self.cachedIntradayData
+
+    def intradaySessions(self, stockSymbol, interval=None):
+        """Group cached intraday ticks into trading sessions aligned with daily SMA rows.
+
+        Returns (windows, prices, dayStarts, smaRows):
+            prices:    flat array of every traded intraday close, as stored (see config.EVAL_STORAGE);
+                       extended-hours ticks outside config.EXTENDED_SESSIONS are left out
+            dayStarts: (sessions + 1,) offsets; session d is prices[dayStarts[d]:dayStarts[d + 1]]
+            smaRows:   (sessions, windows) SMA marks known at each session's open,
+                       i.e. from the last daily row dated before the session (NaN if none)
+        """
+        self.loadIntradayData(stockSymbol, interval)
+        sessions = self.sessionIndex(stockSymbol)
+        windows = np.array(self.config.windows())
+
+        traded = sessions.traded
+        prices = self.cachedIntradayPrices if traded.all() else self.cachedIntradayPrices[traded]
+        dayStarts = sessions.tradedStarts
+        smaRows = np.full((sessions.count, len(windows)), np.nan, dtype=self.cachedSmaMatrix.dtype)
+        known = sessions.dailyRows >= 0
+        smaRows[known] = self.cachedSmaMatrix[sessions.dailyRows[known]]
+        # identifies these sessions and their daily data independently of the window range
+        self.sessionKey = contentKey(prices, dayStarts, sessions.dates.astype("datetime64[ns]").astype(np.int64), self.dailyDataKey)
+        return windows, prices, dayStarts, smaRows
+
+    def sessionIndex(self, stockSymbol):
+        """Return the data.SessionIndex of the cached intraday data, built once per download.
+
+        Loads the intraday and daily data if needed; the index maps every
+        session to its tick range and to the daily row holding its SMA marks.
+        """
+        self.loadIntradayData(stockSymbol, self.cachedInterval if self.cachedSymbol == stockSymbol else None)
+        daily = self.loadDailyData(stockSymbol)
+        if self.cachedSessions is None:
+            dailyDates = pd.DatetimeIndex(daily.index)
+            if dailyDates.tz is not None:
+                dailyDates = dailyDates.tz_localize(None)
+            times = pd.DatetimeIndex(self.cachedIntradayTimes).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+            self.cachedSessions = SessionIndex(times, dailyDates.normalize().to_numpy(), self.config.CLEAN_SESSION_HOURS,
+                                               self.config.EXTENDED_SESSIONS)
+        return self.cachedSessions
+
+    def firstEvaluationSession(self, stockSymbol):
+        """Session replayed on evaluation day 0: the evaluation covers the last EVAL_DAYS - 1 sessions."""
+        return max(self.sessionIndex(stockSymbol).count - (self.config.EVAL_DAYS - 1), 0)
+
+    def evaluationDays(self, stockSymbol):
+        """Number of evaluation days, i.e. downloaded sessions (at most EVAL_DAYS - 1)."""
+        return self.sessionIndex(stockSymbol).count - self.firstEvaluationSession(stockSymbol)
+
+    def dayTicks(self, stockSymbol, dayIndex):
+        """(start, end) range of cachedIntradayPrices replayed on 0-based evaluation day dayIndex."""
+        return self.sessionIndex(stockSymbol).ticks(self.firstEvaluationSession(stockSymbol) + dayIndex)
+
+    def intervalSessions(self, stockSymbol, intervals):
+        """Fetch the finest of intervals once and derive the coarser ones by downsampling.
+
+        Returns (windows, {interval: (prices, dayStarts, smaRows, sessionKey)}),
+        each entry shaped like intradaySessions. Every interval shares the daily
+        SMA matrix; sessionKey identifies its bars for the result cache.
+        """
+        minutes = {interval: intervalMinutes(interval) for interval in intervals}
+        finest = min(intervals, key=minutes.get)
+        for interval in intervals:
+            if minutes[interval] % minutes[finest]:
+                raise ValueError(f"Interval {interval} is not a multiple of the finest interval {finest}")
+        windows, prices, dayStarts, smaRows = self.intradaySessions(stockSymbol, finest)
+        times = pd.DatetimeIndex(self.cachedIntradayTimes)
+        if times.tz is not None:
+            times = times.tz_localize(None)
+        times = times.to_numpy(dtype="datetime64[ns]").astype(np.int64)[self.sessionIndex(stockSymbol).traded]
+
+        sessions = {}
+        for interval in intervals:
+            if minutes[interval] == minutes[finest]:
+                sessions[interval] = (prices, dayStarts, smaRows, self.sessionKey)
+                continue
+            barPrices, barDayStarts, barSessions = resampleSessions(times, prices, dayStarts, minutes[interval])
+            sessions[interval] = (barPrices, barDayStarts, smaRows[barSessions], contentKey(self.sessionKey, minutes[interval]))
+            log.info(f"Resampled {len(prices)} {finest} ticks to {len(barPrices)} {interval} bars")
+        return windows, sessions
+
     def get_last_valid_price(self):
-        """Return the last valid (non-NaN) close price from cached intraday data, or None.
+        """Return the last cleaned close price from cached intraday data, or None.
 
-        Relies on historicalUpdate having populated self.cachedIntradayData.
+        Relies on historicalUpdate having populated self.cachedIntradayPrices.
+        Once the session index is built this is the last traded tick of the
+        latest session with one, so untraded extended-hours ticks (see
+        EXTENDED_SESSIONS) never set the liquidation price.
         """
-        try:
-            data = self.cachedIntradayData
-            if data is None or len(data) == 0:
-                return None
-            # Walk backward to find last non-NaN float
-            for i in range(len(data) - 1, -1, -1):
-                price = data.iloc[i]
-                if not pd.isna(price):
-                    try:
-                        return float(price)
-                    except Exception:
-                        continue
-            return None
-        except Exception:
+        prices = self.cachedIntradayPrices
+        if prices is None or len(prices) == 0:
             return None
+        sessions = self.cachedSessions
+        if sessions is None:
+            return float(self.storage.dollars(prices[-1]))
+        for session in range(sessions.count - 1, -1, -1):
+            start, end = sessions.ticks(session)
+            if end > start:
+                return float(self.storage.dollars(prices[end - 1]))
+        return None
+
     def liveUpdate(self):
-        """Grabs the latest 1m close price with error handling."""
+        """Grabs the latest 1m close price with error handling.
+
+        With a tickSource the next recorded tick is used instead, and Price.txt
+        becomes DONEALL once the recording is exhausted. Each new bar is
+        appended to the journal when one is attached. Returns the price (None
+        at the end of a replay); lastTickLatency holds the seconds from
+        receiving the tick to publishing it in Price.txt.
+        """
         try:
             stockSymbol = open("Stock.txt", "r").readline().strip()
 
-            endDate = datetime.datetime.now().strftime("%Y-%m-%d")
-            startDate = (datetime.datetime.now() - datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+            if self.tickSource is not None:
+                tick = self.tickSource.nextTick()
+                if tick is None:
+                    file = open("Price.txt", "w")
+                    file.write("DONEALL")
+                    file.close()
+                    log.info(f"Tick journal replay for {stockSymbol} finished")
+                    return None
+                received = time.perf_counter()
+                timestamp, _, closePrice = tick
+            else:
+                endDate = datetime.datetime.now().strftime("%Y-%m-%d")
+                startDate = (datetime.datetime.now() - datetime.timedelta(days=1)).strftime("%Y-%m-%d")
 
-            data = self.fetchWithRetries(stockSymbol, "1m", startDate, endDate)
-            
-            if "Close" not in data.columns or data["Close"].empty:
-                logging.warning(f"No close data for {stockSymbol} in liveUpdate")
-                raise RuntimeError("No close data available")
-            
-            closePrice = data["Close"].iloc[-1]
-            
-            if pd.isna(closePrice):
-                logging.warning(f"Latest price is NaN for {stockSymbol}")
-                raise RuntimeError("Latest price is NaN")
+                data = self.fetchWithRetries(stockSymbol, "1m", startDate, endDate)
+                received = time.perf_counter()
+
+                if "Close" not in data.columns or data["Close"].empty:
+                    log.warning(f"No close data for {stockSymbol} in liveUpdate")
+                    raise RuntimeError("No close data available")
+
+                closePrice = data["Close"].iloc[-1]
+                timestamp = data.index[-1].timestamp()
+
+                if pd.isna(closePrice):
+                    log.warning(f"Latest price is NaN for {stockSymbol}")
+                    raise RuntimeError("Latest price is NaN")
+
+                # the same 1m bar is returned until the next one closes; record it once
+                if self.journal is not None and timestamp != self.lastRecordedTimestamp:
+                    self.journal.record(stockSymbol, timestamp, float(closePrice))
+                    self.lastRecordedTimestamp = timestamp
 
             file = open("Price.txt", "w")
             file.write(str(closePrice))
             file.close()
-            logging.info(f"Live price for {stockSymbol}: {closePrice}")
-            
+            self.lastTickLatency = time.perf_counter() - received
+            log.info(f"Live price for {stockSymbol}: {closePrice}")
+            return closePrice
+
         except Exception as e:
-            logging.error(f"liveUpdate failed: {e}", exc_info=True)
+            log.error(f"liveUpdate failed: {e}", exc_info=True)
             file = open("Price.txt", "w")
             file.write("ERROR")
             file.close()
             raise
 
+    def loadDailyData(self, stockSymbol):
+        """Download daily closes and compute all rolling SMAs once per symbol (cached)."""
+        if self.cachedDailyData is None or self.cachedSymbol != stockSymbol:
+            log.info(f"Caching daily data for {stockSymbol}")
+            endDate = datetime.datetime.now().strftime("%Y-%m-%d")
+            startDate = (datetime.datetime.now() - datetime.timedelta(days=1000)).strftime("%Y-%m-%d")
+
+            data = self.fetchWithRetries(stockSymbol, "1d", startDate, endDate)
+
+            if "Close" not in data.columns:
+                log.error(f"No 'Close' column in daily data for {stockSymbol}. Columns: {data.columns.tolist()}")
+                raise RuntimeError("No 'Close' column in daily data")
+
+            # Drop days without a close, then calculate all SMAs, reusing columns cached for identical closes
+            close = data["Close"]
+            if isinstance(close, pd.DataFrame):
+                close = close.iloc[:, 0]
+            hasClose = ~np.isnan(close.to_numpy(dtype=np.float64))
+            if not hasClose.all():
+                log.warning(f"Dropping {int((~hasClose).sum())} daily rows without a close for {stockSymbol}")
+                data, close = data[hasClose].copy(), close[hasClose]
+            windows = np.array(self.config.windows())
+            self.dailyDataKey = contentKey(close.to_numpy(dtype=np.float64))
+
+            def rollingMeans(missing):
+                return {"sma": np.column_stack([close.rolling(window=int(i)).mean().to_numpy(dtype=np.float64) for i in missing])}
+
+            if self.cache is not None:
+                smas = self.cache.windowColumns("sma", self.dailyDataKey, windows, rollingMeans)["sma"]
+            else:
+                smas = rollingMeans(windows)["sma"]
+            # compact storage keeps the SMAs only in the matrix, not as float64 SMA_i columns
+            if not self.storage.compact:
+                for k, i in enumerate(windows):
+                    data[f"SMA_{i}"] = smas[:, k]
+            # warm-up rows (fewer closes than the window) have no SMA yet
+            self.cachedSmaMatrix = self.storage.packSmas(smas)
+            self.cachedSmaValid = warmupMask(len(smas), windows)
+
+            self.cachedDailyData = data
+            self.cachedSymbol = stockSymbol
+            log.info(f"Cached {len(self.cachedDailyData)} daily data points")
+        return self.cachedDailyData
+
+    def smaMatrix(self, stockSymbol):
+        """Return (windows, closes, smas) for the evaluation period as NumPy arrays.
+
+        closes has shape (days,) and smas has shape (days, windows), covering the
+        last EVAL_DAYS daily rows. Warm-up values without enough history are NaN.
+        """
+        data = self.loadDailyData(stockSymbol)
+        windows = np.array(self.config.windows())
+        close = data["Close"]
+        if isinstance(close, pd.DataFrame):
+            close = close.iloc[:, 0]
+        start = max(len(data) - self.config.EVAL_DAYS, 0)
+        closes = close.iloc[start:].to_numpy(dtype=np.float64)
+        return windows, closes, self.cachedSmaMatrix[start:]
+
+    def smaRowIndex(self, stockSymbol, dayIndex):
+        """Daily row holding the SMA marks for 0-based evaluation day dayIndex (-1 if none).
+
+        That is the last daily row dated before the day's session; after the
+        last evaluation day the marks of the last session are kept.
+        """
+        sessions = self.sessionIndex(stockSymbol)
+        if sessions.count == 0:
+            log.warning(f"No intraday sessions available for {stockSymbol}")
+            return -1
+        session = min(self.firstEvaluationSession(stockSymbol) + dayIndex, sessions.count - 1)
+        targetIndex = int(sessions.dailyRows[session])
+        if targetIndex < 0:
+            log.warning(f"No daily data before the session of {sessions.dates[session]} for {stockSymbol}")
+        return targetIndex
+
+    def smaMarks(self, stockSymbol, dayIndex):
+        """Return (marks, warmingUp) for evaluation day dayIndex; warm-up windows read 0.0."""
+        targetIndex = self.smaRowIndex(stockSymbol, dayIndex)
+        if targetIndex < 0:
+            return np.zeros(self.cachedSmaMatrix.shape[1]), self.cachedSmaMatrix.shape[1]
+        valid = self.cachedSmaValid[targetIndex]
+        return np.where(valid, self.cachedSmaMatrix[targetIndex], 0.0), int((~valid).sum())
+
     def smaUpdate(self):
         """Computes rolling SMAs with caching and error handling."""
         try:
             stockSymbol = open("Stock.txt", "r").readline().strip()
 
-            maxDays = EVAL_DAYS - 1  # evaluation period (0-based)
+            maxDays = self.config.EVAL_DAYS - 1  # evaluation period (0-based)
             file1 = open("DayIndex.txt", "r")
             indexRaw = file1.readline()
             file1.close()
             dayIndex = int(indexRaw) - 1
             assert 0 <= dayIndex <= maxDays
 
-            # Download daily data if not cached
-            if self.cachedDailyData is None or self.cachedSymbol != stockSymbol:
-                logging.info(f"Caching daily data for {stockSymbol}")
-                endDate = datetime.datetime.now().strftime("%Y-%m-%d")
-                startDate = (datetime.datetime.now() - datetime.timedelta(days=1000)).strftime("%Y-%m-%d")
-
-                data = self.fetchWithRetries(stockSymbol, "1d", startDate, endDate)
-                
-                if "Close" not in data.columns:
-                    logging.error(f"No 'Close' column in daily data for {stockSymbol}. Columns: {data.columns.tolist()}")
-                    raise RuntimeError("No 'Close' column in daily data")
-                
-                # Calculate all SMAs
-                for i in range(SMA_MIN, SMA_MAX + 1, SMA_STEP):
-                    data[f"SMA_{i}"] = data["Close"].rolling(window=i).mean()
-                
-                self.cachedDailyData = data
-                self.cachedSymbol = stockSymbol
-                logging.info(f"Cached {len(self.cachedDailyData)} daily data points")
-            
-            data = self.cachedDailyData
-            
+            smaRow, nanCount = self.smaMarks(stockSymbol, dayIndex)
             file2 = open("SMA.txt", "w")
-            bufferOffset = len(data) - EVAL_DAYS
-            
-            if bufferOffset < 0:
-                logging.warning(f"Insufficient historical data: {len(data)} days available, need at least {EVAL_DAYS}")
-                bufferOffset = 0
-            
-            targetIndex = bufferOffset + dayIndex
-            
-            if targetIndex >= len(data):
-                logging.error(f"Target index {targetIndex} exceeds data length {len(data)}")
-                targetIndex = len(data) - 1
-            
-            # Build all SMA lines first (avoid partial writes if error later)
-            lines = []
-            nanCount = 0
-            for i in range(SMA_MIN, SMA_MAX + 1, SMA_STEP):
-                smaValue = data[f"SMA_{i}"].iloc[targetIndex]
-                if pd.isna(smaValue):
-                    nanCount += 1
-                    smaValue = 0.0
-                lines.append(str(smaValue))
-            file2.write("\n".join(lines))
+            file2.write("\n".join(map(str, smaRow.tolist())))
             file2.close()
-            logging.debug(f"Updated SMA values for day {dayIndex} (NaN replaced: {nanCount})")
+            log.debug(f"Updated SMA values for day {dayIndex} (NaN replaced: {nanCount})")
             
         except Exception as e:
-            logging.error(f"smaUpdate failed: {e}", exc_info=True)
+            log.error(f"smaUpdate failed: {e}", exc_info=True)
             # Write zeros to prevent crashes
             file2 = open("SMA.txt", "w")
-            for i in range(SMA_MIN, SMA_MAX + 1, SMA_STEP):
+            for i in self.config.windows():
                 file2.write("0.0")
-                if i != SMA_MAX:
+                if i != self.config.SMA_MAX:
                     file2.write("\n")
             file2.close()
             raise
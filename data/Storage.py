@@ -0,0 +1,64 @@
+import logging
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+STORAGE_MODES = ("float64", "float32", "cents")
+CENTS_PER_DOLLAR = 100
+
+
+class MatrixStorage:
+    """In-memory layout of the intraday price array and the daily SMA matrix (config.EVAL_STORAGE).
+
+        float64: prices and SMAs as float64 (the reference path)
+        float32: prices and SMAs as contiguous float32, half the memory
+        cents:   prices as int64 cents (exact to the cent), SMAs as float32
+    Stored arrays are read back through dollars(), one day or one tick at a
+    time, so every comparison and profit is still computed in float64.
+    """
+
+    def __init__(self, mode="float64"):
+        if mode not in STORAGE_MODES:
+            raise ValueError(f"Unknown EVAL_STORAGE '{mode}' (expected one of {', '.join(STORAGE_MODES)})")
+        self.mode = mode
+        self.priceDtype = {"float64": np.float64, "float32": np.float32, "cents": np.int64}[mode]
+        self.smaDtype = np.float64 if mode == "float64" else np.float32
+
+    @property
+    def compact(self):
+        return self.mode != "float64"
+
+    def packPrices(self, prices):
+        """Store float64 dollar prices (NaN-free for cents) as a contiguous array of priceDtype."""
+        prices = np.asarray(prices, dtype=np.float64)
+        if self.mode == "cents":
+            stored = np.rint(prices * CENTS_PER_DOLLAR).astype(np.int64)
+        else:
+            stored = np.ascontiguousarray(prices, dtype=self.priceDtype)
+        if self.compact:
+            self.logPacking("prices", prices, stored, self.dollars(stored))
+        return stored
+
+    def packSmas(self, smas):
+        """Store a (days, windows) SMA matrix as a contiguous array of smaDtype (warm-up NaNs are kept)."""
+        smas = np.asarray(smas, dtype=np.float64)
+        stored = np.ascontiguousarray(smas, dtype=self.smaDtype)
+        if self.compact:
+            self.logPacking("SMA matrix", smas, stored, stored.astype(np.float64))
+        return stored
+
+    def dollars(self, prices):
+        """float64 dollar values of stored prices (an array slice or a single element)."""
+        if self.mode == "cents":
+            return np.asarray(prices, dtype=np.float64) / CENTS_PER_DOLLAR
+        return np.asarray(prices, dtype=np.float64)
+
+    def logPacking(self, name, reference, stored, restored):
+        """Log the memory of a packed array and its largest deviation from the float64 source."""
+        if reference.size == 0:
+            return
+        deviation = np.abs(restored - reference)
+        error = float(np.nanmax(deviation)) if not np.isnan(deviation).all() else 0.0
+        log.info(f"{self.mode} {name}: {stored.nbytes / 2**20:.1f} MB (float64: {reference.nbytes / 2**20:.1f} MB), "
+                 f"max abs error {error:.3g}")
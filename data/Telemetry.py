@@ -0,0 +1,178 @@
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from Config import METRICS_PORT, STATUS_INTERVAL
+
+log = logging.getLogger(__name__)
+
+
+class Telemetry:
+    """Throttled progress counters for long-running evaluations and the live runner.
+
+    The hot loop only bumps counters (tick/observeFetch); rates, progress and
+    ETA are derived when the console status line is due (at most once every
+    STATUS_INTERVAL seconds) or when the metrics endpoint is scraped.
+    Metrics are served in Prometheus text format on 127.0.0.1:<port>/metrics
+    when a port is configured (0 = endpoint disabled).
+    """
+
+    def __init__(self, symbol, mode="eval", port=METRICS_PORT, statusInterval=STATUS_INTERVAL):
+        self.symbol = symbol
+        self.mode = mode
+        self.port = port
+        self.statusInterval = statusInterval
+        self.startTime = time.monotonic()
+        self.ticks = 0
+        self.strategiesEvaluated = 0
+        self.day = 0
+        self.totalDays = 0
+        self.progress = 0.0
+        self.startProgress = None
+        self.openPositionsSource = None  # optional callable returning the open position count
+        self.fetchCount = 0
+        self.fetchSecondsTotal = 0.0
+        self.lastFetchSeconds = 0.0
+        self.ticksPerSecond = 0.0
+        self.strategiesPerSecond = 0.0
+        self.rateTime = self.startTime
+        self.rateTicks = 0
+        self.rateStrategies = 0
+        self.nextStatus = self.startTime + statusInterval
+        self.statusShown = False
+        self.server = None
+
+    def start(self):
+        """Start the metrics endpoint in a daemon thread (no-op if port is 0)."""
+        if not self.port:
+            return
+        telemetry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = telemetry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # keep scrapes out of the console and Debug.log
+
+        try:
+            self.server = ThreadingHTTPServer(("127.0.0.1", self.port), MetricsHandler)
+        except OSError as e:
+            log.error(f"Metrics endpoint unavailable on port {self.port}: {e}")
+            self.server = None
+            return
+        threading.Thread(target=self.server.serve_forever, name="metrics", daemon=True).start()
+        log.info(f"Metrics endpoint listening on http://127.0.0.1:{self.port}/metrics")
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def tick(self, strategies=0, ticks=1):
+        """Count processed price ticks (and the strategy evaluations they took)."""
+        self.ticks += ticks
+        self.strategiesEvaluated += strategies
+        if time.monotonic() >= self.nextStatus:
+            self.printStatus()
+
+    def setDay(self, day, totalDays):
+        self.day = day
+        self.totalDays = totalDays
+
+    def setProgress(self, fraction):
+        """Overall completion in [0, 1]; the first value seen is the baseline for the ETA."""
+        if self.startProgress is None:
+            self.startProgress = fraction
+        self.progress = fraction
+
+    def observeFetch(self, seconds):
+        """Record the latency of one data fetch."""
+        self.fetchCount += 1
+        self.fetchSecondsTotal += seconds
+        self.lastFetchSeconds = seconds
+
+    def openPositions(self):
+        if self.openPositionsSource is None:
+            return 0
+        try:
+            return int(self.openPositionsSource())
+        except Exception:
+            return 0
+
+    def updateRates(self):
+        now = time.monotonic()
+        elapsed = now - self.rateTime
+        if elapsed > 0:
+            self.ticksPerSecond = (self.ticks - self.rateTicks) / elapsed
+            self.strategiesPerSecond = (self.strategiesEvaluated - self.rateStrategies) / elapsed
+        self.rateTime = now
+        self.rateTicks = self.ticks
+        self.rateStrategies = self.strategiesEvaluated
+
+    def eta(self):
+        """Seconds remaining, extrapolated from progress made by this process (None if unknown)."""
+        if self.startProgress is None:
+            return None
+        done = self.progress - self.startProgress
+        if done <= 0:
+            return None
+        return (time.monotonic() - self.startTime) * (1.0 - self.progress) / done
+
+    def printStatus(self):
+        """Overwrite a single console status line (called at most once per interval)."""
+        self.updateRates()
+        self.nextStatus = time.monotonic() + self.statusInterval
+        eta = self.eta()
+        etaStr = "--:--:--" if eta is None else time.strftime("%H:%M:%S", time.gmtime(eta))
+        print(
+            f"\r[{self.symbol}] day {self.day}/{self.totalDays} {self.progress * 100:5.1f}% | "
+            f"{self.ticksPerSecond:,.0f} ticks/s | {self.strategiesPerSecond:,.0f} strategies/s | "
+            f"open {self.openPositions()} | fetch {self.lastFetchSeconds:.2f}s | ETA {etaStr}",
+            end="", flush=True,
+        )
+        self.statusShown = True
+
+    def endStatus(self):
+        """Terminate the status line so regular console output starts on a fresh line."""
+        if self.statusShown:
+            print()
+            self.statusShown = False
+
+    def render(self):
+        """Render all metrics in Prometheus text exposition format."""
+        if time.monotonic() - self.rateTime >= 1.0:
+            self.updateRates()
+        labels = f'symbol="{self.symbol}",mode="{self.mode}"'
+        eta = self.eta()
+        metrics = [
+            ("sma_uptime_seconds", "gauge", "Seconds since the evaluation process started", time.monotonic() - self.startTime),
+            ("sma_ticks_total", "counter", "Price ticks processed", self.ticks),
+            ("sma_ticks_per_second", "gauge", "Recent tick throughput", self.ticksPerSecond),
+            ("sma_strategies_evaluated_total", "counter", "Strategy evaluations (ticks x active strategies)", self.strategiesEvaluated),
+            ("sma_strategies_per_second", "gauge", "Recent strategy evaluation throughput", self.strategiesPerSecond),
+            ("sma_eval_day", "gauge", "Current evaluation day", self.day),
+            ("sma_eval_days", "gauge", "Total evaluation days (EVAL_DAYS)", self.totalDays),
+            ("sma_progress_ratio", "gauge", "Overall completion between 0 and 1", self.progress),
+            ("sma_eta_seconds", "gauge", "Estimated seconds remaining (-1 if unknown)", -1 if eta is None else eta),
+            ("sma_open_positions", "gauge", "Strategies currently holding a position", self.openPositions()),
+            ("sma_fetch_latency_seconds_last", "gauge", "Latency of the most recent data fetch", self.lastFetchSeconds),
+            ("sma_fetch_seconds_total", "counter", "Total time spent fetching data", self.fetchSecondsTotal),
+            ("sma_fetches_total", "counter", "Number of data fetches", self.fetchCount),
+        ]
+        lines = []
+        for name, kind, helpText, value in metrics:
+            lines.append(f"# HELP {name} {helpText}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name}{{{labels}}} {value}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,139 @@
+import logging
+import os
+import struct
+import time
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"SMATJ1\n"
+SYMBOL_RECORD = 1  # <BHB + utf-8 name: define symbol id
+TICK_RECORD = 2    # <BHdd: symbol id, epoch timestamp, price
+SYMBOL_HEADER = struct.Struct("<BHB")
+TICK = struct.Struct("<BHdd")
+
+
+def readRecords(fh, path):
+    """Yield (recordType, values, end) for every complete record after the magic header.
+
+    values is (symbolId, name) for symbol records and (symbolId, timestamp,
+    price) for ticks; end is the file offset just past the record. Stops at
+    a truncated final record (e.g. the recorder was killed mid-write).
+    """
+    while True:
+        kind = fh.read(1)
+        if not kind:
+            return
+        if kind[0] == TICK_RECORD:
+            body = fh.read(TICK.size - 1)
+            if len(body) < TICK.size - 1:
+                return
+            yield TICK_RECORD, TICK.unpack(kind + body)[1:], fh.tell()
+        elif kind[0] == SYMBOL_RECORD:
+            body = fh.read(SYMBOL_HEADER.size - 1)
+            if len(body) < SYMBOL_HEADER.size - 1:
+                return
+            _, symbolId, length = SYMBOL_HEADER.unpack(kind + body)
+            name = fh.read(length)
+            if len(name) < length:
+                return
+            yield SYMBOL_RECORD, (symbolId, name.decode("utf-8")), fh.tell()
+        else:
+            raise ValueError(f"Corrupt tick journal {path}: unknown record type {kind[0]}")
+
+
+def readJournal(path):
+    """Yield (timestamp, symbol, price) for every tick in a journal file, in order.
+
+    A truncated final record (e.g. the recorder was killed mid-write) is ignored.
+    """
+    symbols = {}
+    with open(path, "rb") as fh:
+        if fh.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a tick journal")
+        for recordType, values, _ in readRecords(fh, path):
+            if recordType == SYMBOL_RECORD:
+                symbolId, name = values
+                symbols[symbolId] = name
+            else:
+                symbolId, timestamp, price = values
+                yield timestamp, symbols[symbolId], price
+
+
+class TickJournal:
+    """Append-only binary journal of received ticks (timestamp, symbol, price).
+
+    Each tick is a fixed 19-byte record referencing a symbol id; symbol names
+    are written once, the first time they are seen. Reopening an existing
+    journal continues appending to it, after dropping a truncated final record.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.symbolIds = {}
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            # rebuild the symbol table so appended ticks reuse existing ids, and cut off
+            # a truncated final record so new records do not follow partial bytes
+            with open(path, "r+b") as fh:
+                if fh.read(len(MAGIC)) != MAGIC:
+                    raise ValueError(f"{path} is not a tick journal")
+                end = len(MAGIC)
+                for recordType, values, end in readRecords(fh, path):
+                    if recordType == SYMBOL_RECORD:
+                        symbolId, name = values
+                        self.symbolIds[name] = symbolId
+                size = os.path.getsize(path)
+                if end < size:
+                    log.warning(f"Dropping {size - end} bytes of a truncated record at the end of {path}")
+                    fh.truncate(end)
+            self.file = open(path, "ab")
+        else:
+            self.file = open(path, "wb")
+            self.file.write(MAGIC)
+        self.count = 0
+
+    def record(self, symbol, timestamp, price):
+        """Append one tick and flush it so a crash loses at most the current record."""
+        symbolId = self.symbolIds.get(symbol)
+        if symbolId is None:
+            symbolId = len(self.symbolIds)
+            self.symbolIds[symbol] = symbolId
+            name = symbol.encode("utf-8")
+            self.file.write(SYMBOL_HEADER.pack(SYMBOL_RECORD, symbolId, len(name)) + name)
+        self.file.write(TICK.pack(TICK_RECORD, symbolId, float(timestamp), float(price)))
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+
+class JournalReplay:
+    """Feeds a recorded journal back as a tick source.
+
+    speed 1.0 replays at the recorded pace, N replays N times faster and
+    0 replays as fast as possible. An optional symbol filters the journal.
+    """
+
+    def __init__(self, path, speed=0.0, symbol=None):
+        self.path = path
+        self.speed = speed
+        self.symbol = symbol
+        self.ticks = readJournal(path)
+        self.firstTimestamp = None
+        self.startClock = None
+
+    def nextTick(self):
+        """Return the next (timestamp, symbol, price), pacing per speed; None when exhausted."""
+        for timestamp, symbol, price in self.ticks:
+            if self.symbol is not None and symbol != self.symbol:
+                continue
+            if self.speed > 0:
+                if self.firstTimestamp is None:
+                    self.firstTimestamp = timestamp
+                    self.startClock = time.monotonic()
+                due = self.startClock + (timestamp - self.firstTimestamp) / self.speed
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            return timestamp, symbol, price
+        return None
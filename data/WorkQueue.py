@@ -0,0 +1,149 @@
+import json
+import logging
+import sqlite3
+import time
+
+log = logging.getLogger(__name__)
+
+
+class WorkQueue:
+    """Durable SQLite (WAL) queue of sweep shards claimed by workers under leases.
+
+    A shard is one (symbol, SMA window range, Config overrides) unit of work.
+    Workers claim the oldest pending shard, or one whose lease has expired
+    (its worker died or stalled), renew the lease while running and then mark
+    it done or failed. Failed shards go back to pending until maxAttempts.
+
+    The database only needs a filesystem every worker can lock; SQLite locking
+    is reliable on local disks, so several worker processes on one host (or
+    hosts sharing a filesystem with working POSIX locks) can share a queue.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS shards (
+            shard_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+            sweep         TEXT NOT NULL,
+            symbol        TEXT NOT NULL,
+            sma_min       INTEGER NOT NULL,
+            sma_max       INTEGER NOT NULL,
+            params        TEXT NOT NULL,
+            state         TEXT NOT NULL DEFAULT 'pending',
+            attempts      INTEGER NOT NULL DEFAULT 0,
+            lease_owner   TEXT,
+            lease_expires REAL,
+            run_id        TEXT,
+            error         TEXT,
+            updated_at    REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_shards_state ON shards (state, lease_expires);
+    """
+
+    def __init__(self, path, maxAttempts=3):
+        self.path = path
+        self.maxAttempts = maxAttempts
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def enqueue(self, sweep, shards):
+        """Bulk-add shards: iterable of (symbol, smaMin, smaMax, params dict). Returns the count."""
+        now = time.time()
+        rows = [(sweep, symbol, int(smaMin), int(smaMax), json.dumps(params, sort_keys=True), now)
+                for symbol, smaMin, smaMax, params in shards]
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                "INSERT INTO shards (sweep, symbol, sma_min, sma_max, params, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    def claim(self, worker, leaseSeconds):
+        """Atomically lease the next runnable shard to worker; returns a dict or None."""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # a lease that expired on its last allowed attempt is not retried again
+            self.conn.execute(
+                "UPDATE shards SET state = 'failed', error = 'lease expired', updated_at = ? WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.maxAttempts),
+            )
+            row = self.conn.execute(
+                """
+                SELECT shard_id, sweep, symbol, sma_min, sma_max, params, attempts FROM shards
+                WHERE (state = 'pending' OR (state = 'leased' AND lease_expires < ?)) AND attempts < ?
+                ORDER BY shard_id LIMIT 1
+                """,
+                (now, self.maxAttempts),
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                "UPDATE shards SET state = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? WHERE shard_id = ?",
+                (worker, now + leaseSeconds, now, row[0]),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        shardId, sweep, symbol, smaMin, smaMax, params, attempts = row
+        log.info(f"Worker {worker} leased shard {shardId} ({symbol} SMA {smaMin}-{smaMax}, attempt {attempts + 1})")
+        return {
+            "shard_id": shardId, "sweep": sweep, "symbol": symbol, "sma_min": smaMin, "sma_max": smaMax,
+            "params": json.loads(params), "attempt": attempts + 1,
+        }
+
+    def renew(self, shardId, worker, leaseSeconds):
+        """Extend a lease; returns False if the worker no longer owns it."""
+        now = time.time()
+        cursor = self.conn.execute(
+            "UPDATE shards SET lease_expires = ?, updated_at = ? WHERE shard_id = ? AND lease_owner = ? AND state = 'leased'",
+            (now + leaseSeconds, now, shardId, worker),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, shardId, worker, runId):
+        now = time.time()
+        self.conn.execute(
+            "UPDATE shards SET state = 'done', run_id = ?, error = NULL, lease_expires = NULL, updated_at = ? WHERE shard_id = ? AND lease_owner = ?",
+            (runId, now, shardId, worker),
+        )
+
+    def fail(self, shardId, worker, error):
+        """Release a failed shard for retry, or mark it failed after maxAttempts."""
+        now = time.time()
+        self.conn.execute(
+            """
+            UPDATE shards SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ?
+            WHERE shard_id = ? AND lease_owner = ?
+            """,
+            (self.maxAttempts, str(error)[:2000], now, shardId, worker),
+        )
+        log.warning(f"Shard {shardId} failed on {worker}: {error}")
+
+    def status(self):
+        """Return {state: count}, treating expired leases as 'expired'."""
+        now = time.time()
+        rows = self.conn.execute(
+            """
+            SELECT CASE WHEN state = 'leased' AND lease_expires < ? THEN 'expired' ELSE state END, COUNT(*)
+            FROM shards GROUP BY 1
+            """,
+            (now,),
+        ).fetchall()
+        return dict(rows)
+
+    def failures(self):
+        return self.conn.execute(
+            "SELECT shard_id, symbol, sma_min, sma_max, params, attempts, error FROM shards WHERE state = 'failed' ORDER BY shard_id"
+        ).fetchall()
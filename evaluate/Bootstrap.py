@@ -0,0 +1,130 @@
+import csv
+import logging
+import os
+from multiprocessing import Pool
+
+import numpy as np
+
+from EvalConfig import EvalConfig
+from data.DebugLog import workerLogging
+from evaluate.Shared import attachShared, initWorker, releaseShared, shareArrays, sharedArray
+from evaluate.Simulator import simulateSessions
+
+log = logging.getLogger(__name__)
+
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def resampleDays(rng, days, method, blockDays):
+    """Draw one resampled session order of length `days`.
+
+    'shuffle' returns a permutation of the sessions; 'block' concatenates
+    randomly started runs of blockDays consecutive sessions (moving-block
+    bootstrap, drawn with replacement) and trims to `days`.
+    """
+    if method == 'shuffle':
+        return rng.permutation(days)
+    blockDays = max(1, min(int(blockDays), days))
+    blocks = -(-days // blockDays)
+    starts = rng.integers(0, days - blockDays + 1, size=blocks)
+    order = (starts[:, None] + np.arange(blockDays)[None, :]).ravel()
+    return order[:days]
+
+
+def runReplicates(task):
+    """Simulate a chunk of replicates; returns a (chunk, windows) array of totals."""
+    replicateIds, seed, method, blockDays, config = task
+    windows = sharedArray("windows")
+    prices = sharedArray("prices")
+    dayStarts = sharedArray("dayStarts")
+    smaRows = sharedArray("smaRows")
+    days = len(dayStarts) - 1
+    totals = np.empty((len(replicateIds), len(windows)))
+    for row, replicate in enumerate(replicateIds):
+        # one independent stream per replicate, so results do not depend on the worker count
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(int(replicate),)))
+        order = resampleDays(rng, days, method, blockDays)
+        totals[row] = simulateSessions(windows, prices, dayStarts, smaRows, order, config).totalProfit
+    return totals
+
+
+class BootstrapEvaluator:
+    """Monte Carlo robustness runs over resampled trading-day sequences.
+
+    Each replicate replays the cached intraday sessions (each with its own SMA
+    marks) in a block-bootstrapped or shuffled day order through the vectorized
+    WindowSimulator. Replicates run in a process pool that maps the price data
+    from shared memory, and every replicate has its own seeded RNG stream so a
+    run is reproducible for a given seed regardless of the number of workers.
+    Unset method/blockDays/seed/workers and the trading rules come from config.
+    """
+
+    def __init__(self, windows, prices, dayStarts, smaRows, replicates,
+                 method=None, blockDays=None, seed=None, workers=None, config=None):
+        config = config or EvalConfig.fromConfig()
+        self.arrays = {
+            "windows": np.ascontiguousarray(windows, dtype=np.int64),
+            # prices and SMA marks keep their storage dtype (config.EVAL_STORAGE)
+            "prices": np.ascontiguousarray(prices),
+            "dayStarts": np.ascontiguousarray(dayStarts, dtype=np.int64),
+            "smaRows": np.ascontiguousarray(smaRows),
+        }
+        self.replicates = int(replicates)
+        self.config = config
+        self.method = config.BOOTSTRAP_METHOD if method is None else method
+        self.blockDays = config.BOOTSTRAP_BLOCK_DAYS if blockDays is None else blockDays
+        self.seed = config.BOOTSTRAP_SEED if seed is None else seed
+        workers = config.BOOTSTRAP_WORKERS if workers is None else workers
+        self.workers = workers if workers and workers > 0 else (os.cpu_count() or 1)
+
+    def run(self):
+        """Run all replicates and return a (replicates, windows) array of total profits."""
+        blocks, specs = shareArrays(self.arrays)
+        try:
+            workers = min(self.workers, self.replicates)
+            chunks = np.array_split(np.arange(self.replicates), workers * 4)
+            tasks = [(chunk, self.seed, self.method, self.blockDays, self.config) for chunk in chunks if len(chunk)]
+            log.info(f"Bootstrap: {self.replicates} replicates x {len(self.arrays['windows'])} windows on {workers} worker(s)")
+            if workers == 1:
+                attachShared(specs)
+                results = [runReplicates(task) for task in tasks]
+            else:
+                with Pool(workers, initializer=initWorker, initargs=(specs, workerLogging())) as pool:
+                    results = pool.map(runReplicates, tasks)
+            return np.vstack(results)
+        finally:
+            releaseShared(blocks)
+
+    def summarize(self, totals):
+        """Per-window distribution stats: dict window -> {'mean', 'std', 'q05'.., 'p_loss'}."""
+        quantiles = np.quantile(totals, QUANTILES, axis=0)
+        mean = totals.mean(axis=0)
+        std = totals.std(axis=0)
+        pLoss = (totals < 0).mean(axis=0)
+        stats = {}
+        for k, window in enumerate(self.arrays["windows"]):
+            entry = {'mean': float(mean[k]), 'std': float(std[k]), 'p_loss': float(pLoss[k])}
+            for q, values in zip(QUANTILES, quantiles):
+                entry[f"q{int(q * 100):02d}"] = float(values[k])
+            stats[int(window)] = entry
+        return stats
+
+
+def printDistribution(stats, top=10):
+    """Print the best windows by mean bootstrap profit."""
+    ranked = sorted(stats.items(), key=lambda kv: kv[1]['mean'], reverse=True)
+    print(f"Top {top} SMAs by mean bootstrap profit:")
+    for window, entry in ranked[:top]:
+        print(f"  SMA {window}: mean={entry['mean']:.6f}, std={entry['std']:.6f}, q05={entry['q05']:.6f}, "
+              f"median={entry['q50']:.6f}, q95={entry['q95']:.6f}, p_loss={entry['p_loss']:.3f}")
+
+
+def writeDistributionCsv(stats, path):
+    """Write per-window bootstrap distribution stats to CSV."""
+    columns = ['mean', 'std'] + [f"q{int(q * 100):02d}" for q in QUANTILES] + ['p_loss']
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['sma'] + columns)
+        for window in sorted(stats):
+            writer.writerow([window] + [f"{stats[window][c]:.6f}" for c in columns])
@@ -0,0 +1,114 @@
+import logging
+
+import numpy as np
+
+from EvalConfig import EvalConfig
+
+log = logging.getLogger(__name__)
+
+
+class CrossoverFamily:
+    """Evaluates every fast/slow SMA crossover pair as one dense, vectorized grid.
+
+    Each (fast, slow) pair with fast < slow is a strategy. Signals come from the
+    shared daily SMA matrix and trades execute at the daily close:
+        momentum:       buy when fast > slow + BUY_THRESHOLD, sell when fast < slow - SELL_THRESHOLD
+        mean_reversion: buy when fast < slow - BUY_THRESHOLD, sell when fast > slow + SELL_THRESHOLD
+    Fees and downtime follow the single-SMA rules. Positions still open on the
+    last day are closed at the final close and counted as a trade.
+
+    Pairs are processed in tiles of PAIR_TILE so memory stays bounded no matter
+    how large the window grid is. Rules and tile size come from config (an
+    EvalConfig, default: the values in Config.py).
+    """
+
+    def __init__(self, windows, closes, smas, tile=None, config=None):
+        self.config = config or EvalConfig.fromConfig()
+        tile = self.config.PAIR_TILE if tile is None else tile
+        self.windows = np.asarray(windows)
+        self.closes = np.asarray(closes, dtype=np.float64)
+        self.smas = np.asarray(smas, dtype=np.float64)
+        self.tile = max(int(tile), 1)
+        fastIdx, slowIdx = np.triu_indices(len(self.windows), k=1)
+        self.fastIdx = fastIdx
+        self.slowIdx = slowIdx
+
+    @property
+    def pairCount(self):
+        return len(self.fastIdx)
+
+    def evaluateTile(self, fastIdx, slowIdx):
+        """Simulate one tile of pairs. Returns (trades, total, positive) arrays."""
+        n = len(fastIdx)
+        bought = np.zeros(n, dtype=bool)
+        buyPrice = np.zeros(n)
+        downtime = np.zeros(n, dtype=np.int64)
+        trades = np.zeros(n, dtype=np.int64)
+        total = np.zeros(n)
+        positive = np.zeros(n, dtype=np.int64)
+        config = self.config
+
+        for day in range(len(self.closes)):
+            if day > 0:
+                np.maximum(downtime - 1, 0, out=downtime)
+            price = self.closes[day]
+            if np.isnan(price):
+                continue
+            spread = self.smas[day, fastIdx] - self.smas[day, slowIdx]  # NaN during warm-up -> no signal
+            if config.TRADE_MODE == 'mean_reversion':
+                buy = (~bought) & (downtime == 0) & (spread < -config.BUY_THRESHOLD)
+                sell = bought & (spread > config.SELL_THRESHOLD)
+            else:
+                buy = (~bought) & (downtime == 0) & (spread > config.BUY_THRESHOLD)
+                sell = bought & (spread < -config.SELL_THRESHOLD)
+
+            profit = (price - buyPrice) - config.TRADING_FEE
+            total[sell] += profit[sell]
+            trades[sell] += 1
+            positive[sell & (profit > 0)] += 1
+            downtime[sell] += config.DOWNTIME_DAYS
+            bought[sell] = False
+
+            bought[buy] = True
+            buyPrice[buy] = price
+
+        # close anything still open at the last valid close
+        valid = self.closes[~np.isnan(self.closes)]
+        if len(valid) and bought.any():
+            profit = (valid[-1] - buyPrice) - config.TRADING_FEE
+            total[bought] += profit[bought]
+            trades[bought] += 1
+            positive[bought & (profit > 0)] += 1
+
+        return trades, total, positive
+
+    def evaluate(self):
+        """Evaluate the full pair grid tile by tile.
+
+        Returns per_pair: dict mapping (fast, slow) -> {'count', 'total', 'positive'},
+        the same shape tools/Analyze.py aggregates single windows into.
+        """
+        per_pair = {}
+        log.info(f"Evaluating {self.pairCount} crossover pairs in tiles of {self.tile}")
+        for start in range(0, self.pairCount, self.tile):
+            fastIdx = self.fastIdx[start:start + self.tile]
+            slowIdx = self.slowIdx[start:start + self.tile]
+            trades, total, positive = self.evaluateTile(fastIdx, slowIdx)
+            fastWindows = self.windows[fastIdx]
+            slowWindows = self.windows[slowIdx]
+            for k in range(len(fastIdx)):
+                per_pair[(int(fastWindows[k]), int(slowWindows[k]))] = {
+                    'count': int(trades[k]),
+                    'total': float(total[k]),
+                    'positive': int(positive[k]),
+                }
+        return per_pair
+
+
+def overallStats(per_pair):
+    """Aggregate per-pair stats into Analyze.py's overall dict."""
+    return {
+        'count': sum(stats['count'] for stats in per_pair.values()),
+        'total': sum(stats['total'] for stats in per_pair.values()),
+        'positive': sum(stats['positive'] for stats in per_pair.values()),
+    }
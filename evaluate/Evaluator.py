@@ -1,45 +1,235 @@
 from numpy import double
 import logging
+import os
+from multiprocessing import Pool
 
-from Config import SMA_MIN, SMA_MAX, SMA_STEP, EVALLOG_INTERVAL
+import numpy as np
+
+from EvalConfig import EvalConfig
 from data import LogManager, StockUpdater
+from data.DebugLog import workerLogging
+from data.Telemetry import Telemetry
+from evaluate.Parallel import packState, runSlice, unpackState
+from evaluate.Risk import RiskTracker
 from evaluate.SMA import SMA
+from evaluate.Shared import initWorker, releaseShared, shareArrays
+
+log = logging.getLogger(__name__)
 
 
 class Evaluater:
-    """Coordinates evaluation across multiple SMA strategies."""
+    """Coordinates evaluation across multiple SMA strategies.
+
+    With workers > 1 (0 = one per CPU core) the bots are partitioned across a
+    process pool that maps the intraday prices and daily SMA matrix from
+    shared memory; each worker runs a whole day for its slice of the active
+    bots and the states, totals and log lines are merged at the day boundary.
+
+    Every setting comes from config (an EvalConfig, default: the values in
+    Config.py), which is handed on to the updater, the logger and each bot,
+    so evaluations with different configurations can share one process.
+    metricsPort and workers default to the config's METRICS_PORT and
+    EVAL_WORKERS.
+    """
 
-    def __init__(self, stock):
+    def __init__(self, stock, metricsPort=None, workers=None, config=None):
         self.stock = stock
-        logging.info(f"Evaluator initialized for {stock}")
+        self.config = config or EvalConfig.fromConfig()
+        metricsPort = self.config.METRICS_PORT if metricsPort is None else metricsPort
+        workers = self.config.EVAL_WORKERS if workers is None else workers
+        self.telemetry = Telemetry(stock, mode="eval", port=metricsPort, statusInterval=self.config.STATUS_INTERVAL)
+        self.workers = workers if workers and workers > 0 else (os.cpu_count() or 1)
+        log.info(f"Evaluator initialized for {stock}")
+
+    @staticmethod
+    def markRisk(risk, smaList, price, dayTicks, newDay=True):
+        """Fold the bots' end-of-day state into the streaming risk metrics."""
+        risk.markToMarket(
+            [sma.totalProfit for sma in smaList],
+            [sma.bought for sma in smaList],
+            [sma.buyPrice for sma in smaList],
+            price,
+            [sma.dayTicksInMarket for sma in smaList],
+            dayTicks,
+            newDay=newDay,
+        )
+        for sma in smaList:
+            sma.dayTicksInMarket = 0
+
+    @staticmethod
+    def pruneMask(scores, active, fraction):
+        """Boolean mask of the lowest-scoring `fraction` of the active strategies.
+
+        At least one strategy always survives; ties are broken by window order.
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        active = np.asarray(active, dtype=bool)
+        activeIdx = np.flatnonzero(active)
+        count = min(int(len(activeIdx) * fraction), len(activeIdx) - 1)
+        mask = np.zeros(len(scores), dtype=bool)
+        if count <= 0:
+            return mask
+        ranked = activeIdx[np.argsort(scores[activeIdx], kind="stable")]
+        mask[ranked[:count]] = True
+        return mask
+
+    def prune(self, smaList, risk, day, price, logger):
+        """Successive halving: stop simulating the worst active strategies after `day`.
+
+        Pruned bots keep their partial totals (open positions are closed at the
+        day's last price) and are reported with a pruned marker from then on.
+        """
+        if self.config.PRUNE_METRIC == 'sharpe':
+            scores = risk.sharpe()
+        else:
+            scores = [sma.totalProfit for sma in smaList]
+        mask = self.pruneMask(scores, [sma.prunedDay is None for sma in smaList], self.config.PRUNE_FRACTION)
+        for sma, pruned in zip(smaList, mask):
+            if not pruned:
+                continue
+            if price is not None:
+                sma.force_liquidate(price, logger)
+            sma.prunedDay = day
+            logger.appendToEvalLog(f"SMA bot {sma.days} pruned after day {day} with {sma.totalProfit} in profit.")
+        activeList = [sma for sma in smaList if sma.prunedDay is None]
+        print(f"Pruned {int(mask.sum())} SMAs after day {day} ({len(activeList)} still active)")
+        log.info(f"Pruned {int(mask.sum())} SMAs after day {day} by {self.config.PRUNE_METRIC}; {len(activeList)} still active")
+        return activeList
+
+    def logsPriceIndex(self, priceIndex):
+        """Whether the price at 1-based priceIndex is written to the EvaluationLog (EVALLOG_INTERVAL)."""
+        interval = self.config.EVALLOG_INTERVAL
+        if interval == 0:
+            return True
+        return interval > 0 and (priceIndex % interval == 0 or priceIndex == 1)
+
+    def writeDayLog(self, logger, dayPrices, dayStart, tickStart, tickEnd, lines):
+        """Write a parallel day's bot lines (tick-sorted) interleaved with the price lines, like the tick loop.
+
+        dayPrices holds the session's float64 dollar prices from its first
+        tick (dayStart) on; price indexes count from 1 at that tick.
+        """
+        out = []
+        pos = 0
+        for tick in range(tickStart, tickEnd):
+            if self.logsPriceIndex(tick - dayStart + 1):
+                out.append("Price: " + str(float(dayPrices[tick - dayStart])))
+                out.append("Price Index: " + str(tick - dayStart + 1))
+            while pos < len(lines) and lines[pos][0] == tick:
+                out.append(lines[pos][1])
+                pos += 1
+        logger.appendLinesToEvalLog(out)
+
+    def finishDay(self, updater, logger, smaList, activeList, risk, riskPath, lastPrice, dayTicks, marks=False):
+        """Day boundary: fold the day into risk metrics, advance DayIndex, prune and report totals.
+
+        Returns the (possibly pruned) active list. With marks=True the next
+        day's SMA marks are set from the SMA matrix instead of read per bot
+        from SMA.txt.
+        """
+        self.markRisk(risk, smaList, lastPrice, dayTicks)
+        risk.save(riskPath)
+        logger.clearTotals()
+        with open("DayIndex.txt", "r") as df:
+            currentIndex = int(df.readline())
+        with open("DayIndex.txt", "w") as dfw:
+            dfw.write(str(currentIndex + 1))
+        with open("PriceIndex.txt", "w") as pif:
+            pif.write("1")
+        logger.appendToEvalLog("Day " + str(currentIndex + 1))
+        self.telemetry.endStatus()
+        print(f"Day {currentIndex + 1}")
+        log.info(f"Moving to day {currentIndex + 1}")
+        if currentIndex in self.config.PRUNE_CHECKPOINTS:
+            activeList = self.prune(smaList, risk, currentIndex, lastPrice, logger)
+        try:
+            updater.smaUpdate()
+        except Exception as e:
+            log.error(f"Daily SMA file update failed: {e}")
+            raise
+        smaMarks = updater.smaMarks(self.stock, currentIndex)[0] if marks else None
+        for k, sma in enumerate(smaList):
+            sma.report(logger)
+            sma.smaDowntimeUpdate()
+            if smaMarks is None:
+                sma.smaUpdate(updater)
+            else:
+                sma.smaMark = double(smaMarks[k])
+        logger.commitDailyTotals(currentIndex)
+        logger.endEvalDay(currentIndex)
+        return activeList
+
+    def finishEvaluation(self, updater, logger, smaList, risk, riskPath):
+        """DONEALL: force-liquidate open positions at the final price and close out the run."""
+        # Force-liquidate any still-open positions at the final price
+        final_price = updater.get_last_valid_price()
+        if final_price is not None:
+            force_count = 0
+            for sma in smaList:
+                if sma.force_liquidate(final_price, logger):
+                    force_count += 1
+                logger.stageTotal(sma.days, sma.totalProfit)
+            # Unique summary line for analysis
+            logger.appendToEvalLog(f"Force-liquidated {force_count} positions at {final_price}")
+            log.info(f"Force-liquidated {force_count} positions at {final_price}")
+        else:
+            logger.appendToEvalLog("Force sell skipped! No final price available for force liquidation")
+            log.warning("No final price available for force liquidation")
+        self.markRisk(risk, smaList, final_price, 0, newDay=False)
+        risk.save(riskPath)
+        with open("DayIndex.txt", "r") as df:
+            logger.commitDailyTotals(int(df.readline()))
+        logger.appendToEvalLog("Evaluation Complete!")
+        self.telemetry.stop()
+        self.telemetry.endStatus()
+        print("Evaluation Complete!")
+        try:
+            with open("Stock.txt", "w") as sf:
+                sf.write("")
+        except Exception as cerr:
+            log.error(f"Failed clearing Stock.txt on DONEALL: {cerr}")
+        log.info("Evaluation completed successfully")
 
     def start(self):
-        updater = StockUpdater.StockUpdater()
-        logger = LogManager.LogManager(self.stock)
-        smaList = [SMA(i) for i in range(SMA_MIN, SMA_MAX + 1, SMA_STEP)]
+        updater = StockUpdater.StockUpdater(telemetry=self.telemetry, config=self.config)
+        logger = LogManager.LogManager(self.stock, config=self.config)
+        smaList = [SMA(i, self.config) for i in self.config.windows()]
+        self.telemetry.openPositionsSource = lambda: sum(1 for sma in smaList if sma.bought)
+        self.telemetry.start()
+        risk = RiskTracker([sma.days for sma in smaList])
+        riskPath = f"{self.stock}_Risk.csv"
+        risk.load(riskPath)
+        lastPrice = None
+        dayTicks = 0
         print("Initializing SMA Evaluator...")
         logger.appendToEvalLog("---------------------------------")
 
         try:
             updater.smaUpdate() # start with getting current SMA marks
         except Exception as e:
-            logging.error(f"Initial SMA file update failed: {e}")
+            log.error(f"Initial SMA file update failed: {e}")
             raise
         for sma in smaList:
             logger.updateSMAFromTotals(sma)
             sma.smaUpdate(updater)
+        # strategies pruned before a resume stay pruned
+        activeList = [sma for sma in smaList if sma.prunedDay is None]
 
         with open("DayIndex.txt", "r") as f:
             currentDay = f.readline().strip()
         logger.appendToEvalLog("Day " + currentDay)
 
+        if self.workers > 1:
+            self.startParallel(updater, logger, smaList, activeList, risk, riskPath)
+            return
+
         # trade loop
         while True:
             # get price
             try:
                 updater.historicalUpdate()
             except Exception as e:
-                logging.error(f"historicalUpdate failed: {e}", exc_info=True)
+                log.error(f"historicalUpdate failed: {e}", exc_info=True)
                 raise
 
             with open("Price.txt", "r") as pf:
@@ -50,68 +240,93 @@ class Evaluater:
                 currentPriceIndex = int(rpf.readline())
             
             # Log to EvaluationLog based on config interval
-            if EVALLOG_INTERVAL > 0 and (currentPriceIndex % EVALLOG_INTERVAL == 0 or currentPriceIndex == 1):
-                logger.appendToEvalLog("Price: " + priceMessage)
-                logger.appendToEvalLog("Price Index: " + str(currentPriceIndex))
-            elif EVALLOG_INTERVAL == 0:
+            if self.logsPriceIndex(currentPriceIndex):
                 logger.appendToEvalLog("Price: " + priceMessage)
                 logger.appendToEvalLog("Price Index: " + str(currentPriceIndex))
 
             if priceMessage == "":
-                logging.error("Empty price message")
+                log.error("Empty price message")
                 raise Exception("Error: No price data found.")
             if priceMessage == "DONEALL":
-                # Force-liquidate any still-open positions at the final price
-                final_price = updater.get_last_valid_price()
-                if final_price is not None:
-                    force_count = 0
-                    for sma in smaList:
-                        if sma.force_liquidate(final_price, logger):
-                            force_count += 1
-                    # Unique summary line for analysis
-                    logger.appendToEvalLog(f"Force-liquidated {force_count} positions at {final_price}")
-                    logging.info(f"Force-liquidated {force_count} positions at {final_price}")
-                else:
-                    logger.appendToEvalLog("Force sell skipped! No final price available for force liquidation")
-                    logging.warning("No final price available for force liquidation")
-                logger.appendToEvalLog("Evaluation Complete!")
-                print("Evaluation Complete!")
-                try:
-                    with open("Stock.txt", "w") as sf:
-                        sf.write("")
-                except Exception as cerr:
-                    logging.error(f"Failed clearing Stock.txt on DONEALL: {cerr}")
-                logging.info("Evaluation completed successfully")
+                self.finishEvaluation(updater, logger, smaList, risk, riskPath)
                 break
             if priceMessage == "DONE":
-                logger.clearTotals()
-                with open("DayIndex.txt", "r") as df:
-                    currentIndex = int(df.readline())
-                with open("DayIndex.txt", "w") as dfw:
-                    dfw.write(str(currentIndex + 1))
-                with open("PriceIndex.txt", "w") as pif:
-                    pif.write("1")
-                logger.appendToEvalLog("Day " + str(currentIndex + 1))
-                print(f"Day {currentIndex + 1}")
-                logging.info(f"Moving to day {currentIndex + 1}")
-                try:
-                    updater.smaUpdate()
-                except Exception as e:
-                    logging.error(f"Daily SMA file update failed: {e}")
-                    raise
-                for sma in smaList:
-                    sma.report(logger)
-                    sma.smaDowntimeUpdate()
-                    sma.smaUpdate(updater)
+                activeList = self.finishDay(updater, logger, smaList, activeList, risk, riskPath, lastPrice, dayTicks)
+                dayTicks = 0
                 continue
 
             try:
                 priceValue = double(priceMessage)
             except ValueError as e:
-                logging.error(f"Invalid price value '{priceMessage}': {e}")
+                log.error(f"Invalid price value '{priceMessage}': {e}")
                 continue
-            for sma in smaList:
+            for sma in activeList:
                 sma.smaAction(priceValue, logger)
+            lastPrice = priceValue
+            dayTicks += 1
+            self.telemetry.tick(len(activeList))
 
             with open("PriceIndex.txt", "w") as wpf:
-                wpf.write(str(currentPriceIndex + 1))
\ No newline at end of file
+                wpf.write(str(currentPriceIndex + 1))
+
+    def startParallel(self, updater, logger, smaList, activeList, risk, riskPath):
+        """Day-at-a-time loop with the active bots partitioned across a shared-memory process pool.
+
+        Serves the same session ticks as historicalUpdate and produces the
+        same log, totals and risk files as the tick loop; only the day
+        boundaries run in this process. Prices and SMAs are shared in their
+        storage dtype (config.EVAL_STORAGE) and converted a day at a time.
+        """
+        evalDays = updater.evaluationDays(self.stock)
+        prices = updater.cachedIntradayPrices
+        arrays = {
+            "windows": np.array([sma.days for sma in smaList], dtype=np.int64),
+            "prices": np.ascontiguousarray(prices),
+            "smas": np.ascontiguousarray(updater.cachedSmaMatrix),
+        }
+        position = {sma.days: k for k, sma in enumerate(smaList)}
+        lastPrice = None
+        blocks, specs = shareArrays(arrays)
+        try:
+            log.info(f"Parallel evaluation: {len(smaList)} windows on {self.workers} worker(s)")
+            with Pool(self.workers, initializer=initWorker, initargs=(specs, workerLogging())) as pool:
+                while True:
+                    with open("DayIndex.txt", "r") as df:
+                        dayIndex = int(df.readline()) - 1
+                    with open("PriceIndex.txt", "r") as pf:
+                        priceIndex = int(pf.readline())
+                    if dayIndex >= evalDays:  # all days processed
+                        if self.logsPriceIndex(priceIndex):
+                            logger.appendLinesToEvalLog(["Price: DONEALL", "Price Index: " + str(priceIndex)])
+                        self.finishEvaluation(updater, logger, smaList, risk, riskPath)
+                        break
+
+                    # the rest of the day's session, from PriceIndex on
+                    dayStart, tickEnd = updater.dayTicks(self.stock, dayIndex)
+                    tickStart = min(dayStart + priceIndex - 1, tickEnd)
+                    dayTicks = tickEnd - tickStart
+                    dayPrices = updater.storage.dollars(prices[dayStart:tickEnd])
+                    if dayTicks > 0 and activeList:
+                        smaRow = updater.smaRowIndex(self.stock, dayIndex)
+                        columns = np.array([position[sma.days] for sma in activeList])
+                        slices = [cols for cols in np.array_split(columns, self.workers) if len(cols)]
+                        tasks = [(cols, packState([smaList[k] for k in cols]), tickStart, tickEnd, smaRow, self.config) for cols in slices]
+                        lines = []
+                        for cols, (state, sliceLines) in zip(slices, pool.map(runSlice, tasks)):
+                            unpackState([smaList[k] for k in cols], state)
+                            lines.extend(sliceLines)
+                        # stable sort: within a tick, slices (and bots inside them) stay in window order
+                        lines.sort(key=lambda line: line[0])
+                        self.writeDayLog(logger, dayPrices, dayStart, tickStart, tickEnd, lines)
+                    elif dayTicks > 0:
+                        self.writeDayLog(logger, dayPrices, dayStart, tickStart, tickEnd, [])
+                    if dayTicks > 0:
+                        lastPrice = double(dayPrices[-1])
+                        self.telemetry.setDay(dayIndex + 1, evalDays)
+                        self.telemetry.setProgress((dayIndex + 1) / evalDays)
+                        self.telemetry.tick(len(activeList) * dayTicks, ticks=dayTicks)
+                    if self.logsPriceIndex(tickEnd - dayStart + 1):
+                        logger.appendLinesToEvalLog(["Price: DONE", "Price Index: " + str(tickEnd - dayStart + 1)])
+                    activeList = self.finishDay(updater, logger, smaList, activeList, risk, riskPath, lastPrice, dayTicks, marks=True)
+        finally:
+            releaseShared(blocks)
@@ -0,0 +1,68 @@
+import logging
+
+import numpy as np
+from numpy import double
+
+from data.Storage import MatrixStorage
+from evaluate.SMA import SMA
+from evaluate.Shared import sharedArray
+
+log = logging.getLogger(__name__)
+
+
+# Per-bot fields exchanged between the evaluator and its workers at day boundaries
+STATE_FIELDS = ("bought", "buyPrice", "totalProfit", "downtimeDays", "smaMark", "dayTicksInMarket")
+
+
+class TickLog:
+    """Stand-in for LogManager inside workers: buffers eval-log lines tagged with their tick.
+
+    The evaluator stable-sorts the buffers of all slices by tick, which
+    restores exactly the line order of the single-process loop.
+    """
+
+    def __init__(self):
+        self.tick = 0
+        self.lines = []
+
+    def appendToEvalLog(self, message):
+        self.lines.append((self.tick, message))
+
+
+def packState(smaList):
+    """Snapshot the bots' mutable state as arrays (one per STATE_FIELDS entry)."""
+    return {field: np.array([getattr(sma, field) for sma in smaList]) for field in STATE_FIELDS}
+
+
+def unpackState(smaList, state):
+    for k, sma in enumerate(smaList):
+        sma.bought = bool(state["bought"][k])
+        sma.buyPrice = double(state["buyPrice"][k])
+        sma.totalProfit = double(state["totalProfit"][k])
+        sma.downtimeDays = int(state["downtimeDays"][k])
+        sma.smaMark = double(state["smaMark"][k])
+        sma.dayTicksInMarket = int(state["dayTicksInMarket"][k])
+
+
+def runSlice(task):
+    """Worker: run one day's ticks for a slice of bots against the shared arrays.
+
+    task is (window indexes, state arrays, tickStart, tickEnd, smaRow, config). The
+    day's SMA marks come from row smaRow of the shared daily SMA matrix,
+    reading 0.0 while a window is still warming up (as SMA.txt does), and
+    the day's ticks are converted from config.EVAL_STORAGE to float64 dollars.
+    Returns the updated state arrays and the slice's tagged eval-log lines.
+    """
+    columns, state, tickStart, tickEnd, smaRow, config = task
+    windows = sharedArray("windows")[columns]
+    prices = MatrixStorage(config.EVAL_STORAGE).dollars(sharedArray("prices")[tickStart:tickEnd])
+    state["smaMark"] = np.where(smaRow >= windows - 1, sharedArray("smas")[smaRow, columns], 0.0)
+    smaList = [SMA(int(w), config) for w in windows]
+    unpackState(smaList, state)
+    logger = TickLog()
+    for tick in range(tickStart, tickEnd):
+        price = double(prices[tick - tickStart])
+        logger.tick = tick
+        for sma in smaList:
+            sma.smaAction(price, logger)
+    return packState(smaList), logger.lines
@@ -0,0 +1,122 @@
+import csv
+import os
+
+import numpy as np
+
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+class RiskTracker:
+    """Streaming per-window risk metrics held as arrays (O(1) memory per window).
+
+    Updated once per trading day with each window's mark-to-market equity
+    (realized profit plus the open position valued at the day's last price):
+        peak / maxDrawdown  running equity high-water mark and largest drop from it
+        days / meanReturn / m2  Welford running mean/variance of daily equity changes
+        ticksInMarket / ticksSeen  time in market (exposure)
+    Daily returns are equity changes in price units since the bots trade a
+    single share with no capital base; sharpe is annualized from those.
+    """
+
+    COLUMNS = ['sma', 'equity', 'peak', 'max_drawdown', 'days', 'mean_return', 'm2',
+               'ticks_in_market', 'ticks_seen', 'sharpe', 'exposure']
+
+    def __init__(self, windows):
+        self.windows = np.asarray(windows)
+        n = len(self.windows)
+        self.equity = np.zeros(n)
+        self.peak = np.zeros(n)
+        self.maxDrawdown = np.zeros(n)
+        self.days = 0
+        self.meanReturn = np.zeros(n)
+        self.m2 = np.zeros(n)
+        self.ticksInMarket = np.zeros(n, dtype=np.int64)
+        self.ticksSeen = 0
+
+    def markToMarket(self, realized, bought, buyPrice, price, dayTicksInMarket=None, dayTicks=0, newDay=True):
+        """Record end-of-day equity for every window.
+
+        newDay=False updates equity and drawdown without adding a daily return
+        (used for the final force-liquidation mark).
+        """
+        equity = np.asarray(realized, dtype=np.float64).copy()
+        if price is not None:
+            equity += np.where(bought, price - np.asarray(buyPrice, dtype=np.float64), 0.0)
+        if newDay:
+            dailyReturn = equity - self.equity
+            self.days += 1
+            delta = dailyReturn - self.meanReturn
+            self.meanReturn += delta / self.days
+            self.m2 += delta * (dailyReturn - self.meanReturn)
+        self.equity = equity
+        np.maximum(self.peak, equity, out=self.peak)
+        np.maximum(self.maxDrawdown, self.peak - equity, out=self.maxDrawdown)
+        if dayTicksInMarket is not None:
+            self.ticksInMarket += np.asarray(dayTicksInMarket, dtype=np.int64)
+        self.ticksSeen += int(dayTicks)
+
+    def sharpe(self):
+        """Annualized Sharpe ratio of daily equity changes (0 where undefined)."""
+        if self.days < 2:
+            return np.zeros(len(self.windows))
+        std = np.sqrt(self.m2 / (self.days - 1))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(std > 0, self.meanReturn / std, 0.0)
+        return ratio * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+    def exposure(self):
+        """Fraction of observed ticks each window held a position."""
+        if self.ticksSeen == 0:
+            return np.zeros(len(self.windows))
+        return self.ticksInMarket / self.ticksSeen
+
+    def summary(self):
+        """Return dict window -> {'max_drawdown', 'sharpe', 'exposure', 'equity'}."""
+        sharpe = self.sharpe()
+        exposure = self.exposure()
+        return {
+            int(w): {
+                'max_drawdown': float(self.maxDrawdown[k]),
+                'sharpe': float(sharpe[k]),
+                'exposure': float(exposure[k]),
+                'equity': float(self.equity[k]),
+            }
+            for k, w in enumerate(self.windows)
+        }
+
+    def save(self, path):
+        """Write the full tracker state (plus derived metrics) to CSV, atomically."""
+        sharpe = self.sharpe()
+        exposure = self.exposure()
+        tmpPath = path + ".tmp"
+        with open(tmpPath, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(self.COLUMNS)
+            for k, w in enumerate(self.windows):
+                writer.writerow([
+                    int(w), repr(float(self.equity[k])), repr(float(self.peak[k])), repr(float(self.maxDrawdown[k])),
+                    self.days, repr(float(self.meanReturn[k])), repr(float(self.m2[k])),
+                    int(self.ticksInMarket[k]), self.ticksSeen, f"{sharpe[k]:.6f}", f"{exposure[k]:.6f}",
+                ])
+        os.replace(tmpPath, path)
+
+    def load(self, path):
+        """Restore tracker state saved by save(); windows missing from the file start fresh."""
+        if not os.path.exists(path):
+            return False
+        index = {int(w): k for k, w in enumerate(self.windows)}
+        with open(path, 'r', newline='', encoding='utf-8') as csvfile:
+            for row in csv.DictReader(csvfile):
+                k = index.get(int(row['sma']))
+                if k is None:
+                    continue
+                self.equity[k] = float(row['equity'])
+                self.peak[k] = float(row['peak'])
+                self.maxDrawdown[k] = float(row['max_drawdown'])
+                self.meanReturn[k] = float(row['mean_return'])
+                self.m2[k] = float(row['m2'])
+                self.ticksInMarket[k] = int(row['ticks_in_market'])
+                self.days = int(row['days'])
+                self.ticksSeen = int(row['ticks_seen'])
+        return True
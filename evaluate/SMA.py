@@ -1,11 +1,16 @@
 from numpy import double
 import logging
 
-from Config import SMA_MIN, SMA_STEP, BUY_THRESHOLD, SELL_THRESHOLD, TRADING_FEE, DOWNTIME_DAYS, TRADE_MODE
+from EvalConfig import EvalConfig
+
+log = logging.getLogger(__name__)
 
 
 class SMA:
-    """Represents a single Simple Moving Average trading strategy with buy/sell logic."""
+    """Represents a single Simple Moving Average trading strategy with buy/sell logic.
+
+    Trading rules (thresholds, fee, downtime, mode) come from its EvalConfig.
+    """
 
     days = 0
     bought = False
@@ -13,14 +18,20 @@ class SMA:
     totalProfit = double(0.0)
     downtimeDays = 0
     smaMark = double(0.0)
+    dayTicksInMarket = 0
+    prunedDay = None
+    config = None
 
-    def __init__(self, days):
+    def __init__(self, days, config=None):
         self.days = days
+        self.config = config or EvalConfig.fromConfig()
         self.bought = False
         self.buyPrice = double(0.0)
         self.totalProfit = double(0.0)
         self.downtimeDays = 0
         self.smaMark = double(0.0)
+        self.dayTicksInMarket = 0  # ticks held today, folded into RiskTracker exposure at day end
+        self.prunedDay = None  # day after which successive halving stopped this bot
 
     def smaUpdate(self, updater):
         """Active every trade day at end - update SMA mark from file."""
@@ -30,7 +41,7 @@ class SMA:
         try:
             readFile = open("SMA.txt", "r")
             # Calculate which line this SMA is on (0-indexed)
-            lineIndex = (self.days - SMA_MIN) // SMA_STEP
+            lineIndex = (self.days - self.config.SMA_MIN) // self.config.SMA_STEP
             
             # Read to the correct line
             for _ in range(lineIndex):
@@ -40,19 +51,19 @@ class SMA:
             readFile.close()
             
             if smaValue == "" or smaValue == "NaN":
-                logging.warning(f"Invalid SMA value for SMA {self.days}: '{smaValue}'")
+                log.warning(f"Invalid SMA value for SMA {self.days}: '{smaValue}'")
                 # Keep previous value
                 return
             
             self.smaMark = double(smaValue)
 
         except Exception as e:
-            logging.error(f"Error trying to read SMA data for SMA {self.days}: {e}")
+            log.error(f"Error trying to read SMA data for SMA {self.days}: {e}")
             raise e
 
     def report(self, logger):
         """Send profits so far to logger for printing."""
-        logger.giveEvalReport(self.days, self.totalProfit)
+        logger.giveEvalReport(self.days, self.totalProfit, self.prunedDay)
 
     def force_liquidate(self, price, logger):
         """Force-liquidate any open position at the provided price.
@@ -61,7 +72,7 @@ class SMA:
         Writes a unique message to the evaluation log for easy grep/analysis.
         """
         if self.bought:
-            profit = ((price - self.buyPrice) - TRADING_FEE)
+            profit = ((price - self.buyPrice) - self.config.TRADING_FEE)
             self.totalProfit = self.totalProfit + profit
             tempProfit = double(profit)
             # Unique marker: FORCE-LIQUIDATED
@@ -81,15 +92,16 @@ class SMA:
 
     def smaAction(self, price, logger):
         """Active every time slice during trade time - buy/sell logic."""
+        config = self.config
         # Determine buy/sell signals based on TRADE_MODE
-        if TRADE_MODE == 'mean_reversion':
+        if config.TRADE_MODE == 'mean_reversion':
             # mean reversion: buy when price is sufficiently below SMA, sell when above
-            buy_condition = (not self.bought) and (self.downtimeDays == 0) and (price + BUY_THRESHOLD < self.smaMark)
-            sell_condition = self.bought and (price > self.smaMark + SELL_THRESHOLD)
+            buy_condition = (not self.bought) and (self.downtimeDays == 0) and (price + config.BUY_THRESHOLD < self.smaMark)
+            sell_condition = self.bought and (price > self.smaMark + config.SELL_THRESHOLD)
         else:
             # default/momentum: buy when price sufficiently above SMA, sell when below
-            buy_condition = (not self.bought) and (self.downtimeDays == 0) and (self.smaMark + BUY_THRESHOLD < price)
-            sell_condition = self.bought and (self.smaMark > price + SELL_THRESHOLD)
+            buy_condition = (not self.bought) and (self.downtimeDays == 0) and (self.smaMark + config.BUY_THRESHOLD < price)
+            sell_condition = self.bought and (self.smaMark > price + config.SELL_THRESHOLD)
 
         if buy_condition:
             self.bought = True
@@ -99,10 +111,12 @@ class SMA:
             )
         if sell_condition:
             # perform sell
-            self.downtimeDays = self.downtimeDays + DOWNTIME_DAYS
+            self.downtimeDays = self.downtimeDays + config.DOWNTIME_DAYS
             self.bought = False
-            self.totalProfit = self.totalProfit + ((price - self.buyPrice) - TRADING_FEE)
-            tempProfit = double(((price - self.buyPrice) - TRADING_FEE))
+            self.totalProfit = self.totalProfit + ((price - self.buyPrice) - config.TRADING_FEE)
+            tempProfit = double(((price - self.buyPrice) - config.TRADING_FEE))
             logger.appendToEvalLog(
                 f"SMA bot {self.days} sold at {price} for a profit of {tempProfit}. SMA: {self.smaMark}."
             )
+        if self.bought:
+            self.dayTicksInMarket += 1
@@ -0,0 +1,59 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from data.DebugLog import attachWorkerLogging
+
+# Views onto the parent's shared-memory arrays in this process (set by attachShared)
+_attached = {}
+
+
+def shareArray(array):
+    """Copy an array into a new shared-memory block; returns (block, spec) for workers."""
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    view[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def shareArrays(arrays):
+    """Share every array of a {key: array} dict; returns (blocks, specs) for releaseShared and attachShared."""
+    blocks = []
+    specs = {}
+    try:
+        for key, array in arrays.items():
+            block, spec = shareArray(array)
+            blocks.append(block)
+            specs[key] = spec
+    except Exception:
+        releaseShared(blocks)
+        raise
+    return blocks, specs
+
+
+def attachShared(specs):
+    """Map the parent's shared-memory arrays into this process without copying."""
+    for key, (name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=name)
+        _attached[key] = (block, np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf))
+
+
+def initWorker(specs, logSpec):
+    """Pool initializer: map the shared arrays and log to the parent's Debug.log (data.DebugLog.workerLogging)."""
+    attachWorkerLogging(logSpec)
+    attachShared(specs)
+
+
+def sharedArray(key):
+    """The attached shared array registered under key."""
+    return _attached[key][1]
+
+
+def releaseShared(blocks):
+    """Detach this process's views and free the blocks created by shareArrays."""
+    for block, _ in _attached.values():
+        block.close()
+    _attached.clear()
+    for block in blocks:
+        block.close()
+        block.unlink()
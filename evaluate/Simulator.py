@@ -0,0 +1,190 @@
+import numpy as np
+
+from EvalConfig import EvalConfig
+from data.ResultCache import contentKey
+from data.Storage import STORAGE_MODES, MatrixStorage
+from evaluate.Risk import RiskTracker
+
+# Per-window arrays returned by backtestWindows/cachedBacktest
+RESULT_FIELDS = ('trades', 'total', 'wins', 'max_drawdown', 'sharpe', 'exposure')
+
+
+class WindowSimulator:
+    """Array-form equivalent of a list of SMA bots, one slot per window.
+
+    Follows the same rules as evaluate/SMA.py tick for tick: signals compare
+    each intraday price to that day's SMA mark, a sale adds DOWNTIME_DAYS of
+    downtime, and downtime is decremented once at the start of every new day.
+    Instead of stepping every tick through Python, runDay finds each window's
+    next buy/sell tick with vectorized first-hit searches over the day's
+    (ticks x windows) signal matrix. NaN SMA marks never signal.
+
+    Streaming risk metrics (equity, drawdown, Sharpe, exposure) are kept in
+    self.risk and updated at the end of every day. Trading rules come from
+    config (an EvalConfig, default: the values in Config.py).
+    """
+
+    def __init__(self, windows, config=None):
+        self.config = config or EvalConfig.fromConfig()
+        self.windows = np.asarray(windows)
+        n = len(self.windows)
+        self.bought = np.zeros(n, dtype=bool)
+        self.buyPrice = np.zeros(n)
+        self.totalProfit = np.zeros(n)
+        self.downtimeDays = np.zeros(n, dtype=np.int64)
+        self.trades = np.zeros(n, dtype=np.int64)
+        self.wins = np.zeros(n, dtype=np.int64)
+        self.daysRun = 0
+        self.risk = RiskTracker(self.windows)
+
+    def signals(self, prices, smaRow):
+        """Return (buyHit, sellHit) boolean matrices of shape (ticks, windows)."""
+        p = prices[:, None]
+        s = smaRow[None, :]
+        config = self.config
+        if config.TRADE_MODE == 'mean_reversion':
+            return p + config.BUY_THRESHOLD < s, p > s + config.SELL_THRESHOLD
+        return s + config.BUY_THRESHOLD < p, s > p + config.SELL_THRESHOLD
+
+    def sell(self, mask, price):
+        profit = (price - self.buyPrice) - self.config.TRADING_FEE
+        self.totalProfit[mask] += profit[mask]
+        self.trades[mask] += 1
+        self.wins[mask & (profit > 0)] += 1
+        self.downtimeDays[mask] += self.config.DOWNTIME_DAYS
+        self.bought[mask] = False
+
+    def runDay(self, prices, smaRow):
+        """Simulate one trading day of intraday prices against one row of SMA marks."""
+        if self.daysRun > 0:
+            np.maximum(self.downtimeDays - 1, 0, out=self.downtimeDays)
+        self.daysRun += 1
+        prices = np.asarray(prices, dtype=np.float64)
+        ticks = len(prices)
+        if ticks == 0:
+            return
+        n = len(self.windows)
+        buyHit, sellHit = self.signals(prices, np.asarray(smaRow, dtype=np.float64))
+        tickIdx = np.arange(ticks)[:, None]
+        cursor = np.zeros(n, dtype=np.int64)  # next tick each window may act on
+        live = np.ones(n, dtype=bool)
+        cols = np.arange(n)
+        entryTick = np.zeros(n, dtype=np.int64)  # open positions carried in count from tick 0
+        dayTicksInMarket = np.zeros(n, dtype=np.int64)
+
+        while live.any():
+            canBuy = live & ~self.bought & (self.downtimeDays == 0)
+            canSell = live & self.bought
+            hits = np.where(self.bought[None, :], sellHit, buyHit) & (tickIdx >= cursor[None, :])
+            first = hits.argmax(axis=0)
+            found = hits[first, cols] & (canBuy | canSell)
+            live &= found
+            if not live.any():
+                break
+            eventPrice = prices[first]
+            sells = live & self.bought
+            buys = live & ~self.bought
+            self.sell(sells, eventPrice)
+            dayTicksInMarket[sells] += first[sells] - entryTick[sells]
+            self.bought[buys] = True
+            self.buyPrice[buys] = eventPrice[buys]
+            entryTick[buys] = first[buys]
+            cursor = first + 1
+            live &= cursor < ticks
+
+        dayTicksInMarket[self.bought] += ticks - entryTick[self.bought]
+        valid = prices[~np.isnan(prices)]
+        lastPrice = valid[-1] if len(valid) else None
+        self.risk.markToMarket(self.totalProfit, self.bought, self.buyPrice, lastPrice, dayTicksInMarket, ticks)
+
+    def forceLiquidate(self, price):
+        """Close every open position at price; returns the number closed."""
+        openMask = self.bought.copy()
+        profit = (price - self.buyPrice) - self.config.TRADING_FEE
+        self.totalProfit[openMask] += profit[openMask]
+        self.bought[openMask] = False
+        self.buyPrice[openMask] = 0.0
+        self.risk.markToMarket(self.totalProfit, self.bought, self.buyPrice, price, newDay=False)
+        return int(openMask.sum())
+
+
+def simulateSessions(windows, prices, dayStarts, smaRows, dayOrder=None, config=None):
+    """Run a WindowSimulator over a sequence of sessions and return it.
+
+    prices is the flat intraday price array, dayStarts the (days + 1,) offsets
+    delimiting each session inside it, and smaRows the (days, windows) SMA
+    marks per session. dayOrder optionally replays sessions in another order
+    (used by bootstrap resampling). Open positions are force-liquidated at the
+    last price of the final session. prices may be stored compactly
+    (config.EVAL_STORAGE); each session is read back as float64 dollars.
+    """
+    sim = WindowSimulator(windows, config)
+    storage = MatrixStorage(sim.config.EVAL_STORAGE)
+    order = range(len(dayStarts) - 1) if dayOrder is None else dayOrder
+    lastPrice = None
+    for day in order:
+        dayPrices = storage.dollars(prices[dayStarts[day]:dayStarts[day + 1]])
+        sim.runDay(dayPrices, smaRows[day])
+        if len(dayPrices):
+            lastPrice = dayPrices[-1]
+    if lastPrice is not None:
+        sim.forceLiquidate(lastPrice)
+    return sim
+
+
+def backtestWindows(windows, prices, dayStarts, smaRows, config=None):
+    """Simulate all sessions and return per-window result arrays keyed by RESULT_FIELDS."""
+    sim = simulateSessions(windows, prices, dayStarts, smaRows, config=config)
+    return {
+        'trades': sim.trades, 'total': sim.totalProfit, 'wins': sim.wins,
+        'max_drawdown': sim.risk.maxDrawdown, 'sharpe': sim.risk.sharpe(), 'exposure': sim.risk.exposure(),
+    }
+
+
+def backtestKey(sessionKey, config=None):
+    """Cache key for backtest results: the session data plus every trading rule that shapes them."""
+    config = config or EvalConfig.fromConfig()
+    return contentKey(sessionKey, {
+        name: getattr(config, name) for name in ('BUY_THRESHOLD', 'SELL_THRESHOLD', 'TRADING_FEE', 'DOWNTIME_DAYS', 'TRADE_MODE')
+    })
+
+
+def cachedBacktest(windows, prices, dayStarts, smaRows, cache, key, config=None):
+    """backtestWindows through a data.ResultCache: windows already cached under key are not resimulated."""
+    if cache is None:
+        return backtestWindows(windows, prices, dayStarts, smaRows, config)
+    column = {int(w): k for k, w in enumerate(windows)}
+
+    def compute(missing):
+        return backtestWindows(missing, prices, dayStarts, smaRows[:, [column[int(w)] for w in missing]], config)
+
+    return cache.windowColumns("backtest", key, windows, compute)
+
+
+def storageAccuracy(windows, prices, dayStarts, smaRows, config=None):
+    """Backtest the same sessions in every EVAL_STORAGE mode and compare against the float64 path.
+
+    prices and smaRows are the float64 reference (as loaded with
+    EVAL_STORAGE = 'float64'); each mode stores them the way StockUpdater
+    would. Returns {mode: stats} where stats holds the stored sizes
+    ('prices_mb', 'smas_mb'), the largest total profit and Sharpe deviation
+    from float64 and the number of windows whose trade count differs.
+    """
+    config = config or EvalConfig.fromConfig()
+    report = {}
+    reference = None
+    for mode in STORAGE_MODES:  # float64 first: the reference
+        storage = MatrixStorage(mode)
+        storedPrices, storedSmas = storage.packPrices(prices), storage.packSmas(smaRows)
+        results = backtestWindows(windows, storedPrices, dayStarts, storedSmas, config.replace(EVAL_STORAGE=mode))
+        if reference is None:
+            reference = results
+        sharpeError = np.abs(results['sharpe'] - reference['sharpe'])
+        report[mode] = {
+            'prices_mb': storedPrices.nbytes / 2**20,
+            'smas_mb': storedSmas.nbytes / 2**20,
+            'max_total_error': float(np.max(np.abs(results['total'] - reference['total']), initial=0.0)),
+            'max_sharpe_error': float(np.nanmax(sharpeError)) if not np.isnan(sharpeError).all() else 0.0,
+            'trade_mismatches': int((results['trades'] != reference['trades']).sum()),
+        }
+    return report
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+import Config
+from EvalConfig import OUTPUT_FIELDS, PROCESS_FIELDS, EvalConfig, configFields, fingerprintFields
+
+
+def test_attributes_are_immutable():
+    config = EvalConfig.fromConfig()
+    with pytest.raises(AttributeError):
+        config.TRADING_FEE = 1.0
+    with pytest.raises(AttributeError):
+        del config.TRADING_FEE
+
+
+def test_lists_are_frozen_to_tuples():
+    config = EvalConfig.fromConfig(PRUNE_CHECKPOINTS=[5, 10], EVAL_INTERVALS=["2m", "10m"])
+    assert config.PRUNE_CHECKPOINTS == (5, 10)
+    assert config.EVAL_INTERVALS == ("2m", "10m")
+
+
+def test_non_scalar_values_are_rejected():
+    with pytest.raises(ValueError):
+        EvalConfig.fromConfig(CACHE_DIR={"a": 1})
+    with pytest.raises(ValueError):
+        EvalConfig.fromConfig(PRUNE_CHECKPOINTS=[{5}])
+
+
+def test_unknown_and_process_fields_are_rejected():
+    with pytest.raises(ValueError):
+        EvalConfig.fromConfig(NOT_A_SETTING=1)
+    for name in PROCESS_FIELDS:
+        with pytest.raises(ValueError):
+            EvalConfig.fromConfig(**{name: 1})
+
+
+def test_replace_returns_a_new_config():
+    config = EvalConfig.fromConfig()
+    variant = config.replace(TRADING_FEE=config.TRADING_FEE + 1)
+    assert variant.TRADING_FEE == config.TRADING_FEE + 1
+    assert config == EvalConfig.fromConfig()
+    assert variant != config
+
+
+def test_equal_configs_hash_and_fingerprint_alike():
+    a = EvalConfig.fromConfig(PRUNE_CHECKPOINTS=[5, 10])
+    b = EvalConfig.fromConfig(PRUNE_CHECKPOINTS=(5, 10))
+    assert a == b
+    assert hash(a) == hash(b)
+    assert a.fingerprint() == b.fingerprint()
+    assert len({a, b}) == 1
+
+
+def test_fingerprint_is_stable_json_hash():
+    config = EvalConfig.fromConfig()
+    assert config.fingerprint() == EvalConfig.fromConfig().fingerprint()
+    assert len(config.fingerprint()) == 16
+    values = config.fingerprintValues()
+    assert values == json.loads(json.dumps(values))
+    assert set(values) == set(fingerprintFields())
+
+
+def test_fingerprint_covers_every_field_but_output_settings():
+    config = EvalConfig.fromConfig()
+    assert set(fingerprintFields()) == set(configFields()) - set(OUTPUT_FIELDS)
+    assert set(OUTPUT_FIELDS) <= set(configFields())
+    for name in ("TRADING_FEE", "BOOTSTRAP_SEED", "BOOTSTRAP_METHOD", "EVAL_INTERVALS", "PRUNE_FRACTION"):
+        assert name in fingerprintFields()
+    assert config.replace(BOOTSTRAP_SEED=Config.BOOTSTRAP_SEED + 1).fingerprint() != config.fingerprint()
+    assert config.replace(EVAL_WORKERS=Config.EVAL_WORKERS + 3).fingerprint() == config.fingerprint()
+    assert config.replace(RESULTS_DB="elsewhere.db").fingerprint() == config.fingerprint()
+
+
+def test_overrides_from_specs_and_files(tmp_path):
+    path = tmp_path / "fees.json"
+    path.write_text(json.dumps({"TRADING_FEE": 0.5, "DOWNTIME_DAYS": 3}))
+    config = EvalConfig.fromArgs(str(path), ["DOWNTIME_DAYS=4", "TRADE_MODE=momentum"])
+    assert (config.TRADING_FEE, config.DOWNTIME_DAYS, config.TRADE_MODE) == (0.5, 4, "momentum")
+    with pytest.raises(ValueError):
+        EvalConfig.fromArgs(None, ["TRADING_FEE"])
@@ -0,0 +1,60 @@
+import os
+
+from data.TickJournal import TICK, JournalReplay, TickJournal, readJournal
+
+
+def record(path, ticks):
+    journal = TickJournal(str(path))
+    for symbol, timestamp, price in ticks:
+        journal.record(symbol, timestamp, price)
+    journal.close()
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "ticks.bin"
+    record(path, [("AAPL", 1.0, 100.5), ("MSFT", 2.0, 300.25), ("AAPL", 3.0, 101.0)])
+    assert list(readJournal(str(path))) == [(1.0, "AAPL", 100.5), (2.0, "MSFT", 300.25), (3.0, "AAPL", 101.0)]
+
+
+def test_reopen_appends_and_reuses_symbol_ids(tmp_path):
+    path = tmp_path / "ticks.bin"
+    record(path, [("AAPL", 1.0, 100.0), ("MSFT", 2.0, 300.0)])
+    journal = TickJournal(str(path))
+    assert journal.symbolIds == {"AAPL": 0, "MSFT": 1}
+    journal.record("MSFT", 3.0, 301.0)
+    journal.record("TSLA", 4.0, 200.0)
+    journal.close()
+    assert list(readJournal(str(path))) == [(1.0, "AAPL", 100.0), (2.0, "MSFT", 300.0), (3.0, "MSFT", 301.0), (4.0, "TSLA", 200.0)]
+
+
+def test_truncated_record_is_dropped_then_appended_after(tmp_path):
+    path = tmp_path / "ticks.bin"
+    record(path, [("AAPL", 1.0, 100.0), ("AAPL", 2.0, 101.0), ("AAPL", 3.0, 102.0)])
+    size = os.path.getsize(path)
+    # the recorder was killed mid-write: the last tick lost its final bytes
+    os.truncate(path, size - 7)
+    assert list(readJournal(str(path))) == [(1.0, "AAPL", 100.0), (2.0, "AAPL", 101.0)]
+
+    record(path, [("AAPL", 4.0, 103.0), ("AAPL", 5.0, 104.0)])
+    assert os.path.getsize(path) == size - TICK.size + 2 * TICK.size
+    assert list(readJournal(str(path))) == [(1.0, "AAPL", 100.0), (2.0, "AAPL", 101.0), (4.0, "AAPL", 103.0), (5.0, "AAPL", 104.0)]
+
+
+def test_truncated_symbol_record_is_dropped(tmp_path):
+    path = tmp_path / "ticks.bin"
+    record(path, [("AAPL", 1.0, 100.0)])
+    size = os.path.getsize(path)
+    record(path, [("MSFT", 2.0, 300.0)])
+    # cut inside MSFT's symbol record, before its first tick
+    os.truncate(path, size + 4)
+    record(path, [("MSFT", 3.0, 301.0)])
+    assert list(readJournal(str(path))) == [(1.0, "AAPL", 100.0), (3.0, "MSFT", 301.0)]
+
+
+def test_replay_filters_symbol(tmp_path):
+    path = tmp_path / "ticks.bin"
+    record(path, [("AAPL", 1.0, 100.0), ("MSFT", 2.0, 300.0), ("AAPL", 3.0, 101.0)])
+    replay = JournalReplay(str(path), symbol="AAPL")
+    assert replay.nextTick() == (1.0, "AAPL", 100.0)
+    assert replay.nextTick() == (3.0, "AAPL", 101.0)
+    assert replay.nextTick() is None
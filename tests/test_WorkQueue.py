@@ -0,0 +1,76 @@
+import pytest
+
+from data.WorkQueue import WorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"), maxAttempts=2)
+    queue.enqueue("sweep", [("AAPL", 1, 50, {"TRADE_MODE": "momentum"})])
+    yield queue
+    queue.close()
+
+
+def state(queue, shardId):
+    return queue.conn.execute("SELECT state, attempts, lease_owner, error FROM shards WHERE shard_id = ?", (shardId,)).fetchone()
+
+
+def test_claim_leases_the_pending_shard(queue):
+    shard = queue.claim("w1", 60)
+    assert shard["shard_id"] == 1
+    assert shard["params"] == {"TRADE_MODE": "momentum"}
+    assert shard["attempt"] == 1
+    assert state(queue, 1)[:3] == ("leased", 1, "w1")
+    # a live lease is not handed to another worker
+    assert queue.claim("w2", 60) is None
+
+
+def test_expired_lease_is_reclaimed(queue):
+    queue.claim("w1", -1)
+    shard = queue.claim("w2", 60)
+    assert shard["shard_id"] == 1
+    assert shard["attempt"] == 2
+    assert state(queue, 1)[:3] == ("leased", 2, "w2")
+
+
+def test_expiry_on_final_attempt_marks_failed(queue):
+    queue.claim("w1", -1)
+    queue.claim("w2", -1)
+    assert queue.claim("w3", 60) is None
+    assert state(queue, 1)[0] == "failed"
+    assert state(queue, 1)[3] == "lease expired"
+    assert queue.status() == {"failed": 1}
+
+
+def test_fail_retries_until_max_attempts(queue):
+    queue.claim("w1", 60)
+    queue.fail(1, "w1", "boom")
+    assert state(queue, 1) == ("pending", 1, None, "boom")
+    queue.claim("w2", 60)
+    queue.fail(1, "w2", "boom again")
+    assert state(queue, 1)[0] == "failed"
+    assert queue.claim("w3", 60) is None
+    assert [row[0] for row in queue.failures()] == [1]
+
+
+def test_fail_by_non_owner_is_ignored(queue):
+    queue.claim("w1", 60)
+    queue.fail(1, "w2", "not mine")
+    assert state(queue, 1)[:3] == ("leased", 1, "w1")
+
+
+def test_renew_by_owner_and_non_owner(queue):
+    queue.claim("w1", 60)
+    assert queue.renew(1, "w1", 60)
+    assert not queue.renew(1, "w2", 60)
+
+
+def test_renew_after_takeover_returns_false(queue):
+    queue.claim("w1", -1)
+    queue.claim("w2", 60)
+    assert not queue.renew(1, "w1", 60)
+    queue.complete(1, "w1", "stale")
+    assert state(queue, 1)[0] == "leased"
+    queue.complete(1, "w2", "run-1")
+    assert state(queue, 1)[0] == "done"
+    assert not queue.renew(1, "w2", 60)
@@ -4,7 +4,7 @@ Usage examples:
     # analyze by stock symbol (looks for '<STOCK>_EvaluationLog.txt')
     python3 tools/Analyze.py --stock AMZN
 
-    # analyze a specific log file path
+    # analyze a specific log file path (its rotated segments are read too)
     python3 tools/Analyze.py --log-file AMZN_EvaluationLog.txt
 
 Options:
@@ -12,6 +12,12 @@ Options:
     --log-file PATH      Path to an evaluation log file to analyze
     --top N              Show top N worst/best SMAs (default 10)
     --csv OUT            Write per-SMA aggregated results to CSV file
+    --risk-file PATH     Risk metrics CSV written by the evaluator (default '<STOCK>_Risk.csv')
+    --db PATH            Record per-SMA aggregates into the SQLite results store
+    --run-id ID          Run id to record under (default: contents of RunId.txt)
+    --db-report MODE     Query the results store instead of parsing a log:
+                           'best' -> best windows for --stock over the last --runs runs
+                           'top'  -> top windows across all symbols and runs
 
 The script parses "sold" entries (realized trades) and reports counts,
 aggregate and average profits, and lists worst/best-performing SMA windows.
@@ -22,10 +28,17 @@ from __future__ import annotations
 import argparse
 import re
 from collections import defaultdict
-from typing import Dict, Tuple
+from contextlib import closing
+from typing import Dict, Optional, Tuple
 import csv
+import os
 import sys
 
+# allow importing repo modules (data/, Config) when run as tools/Analyze.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.EvalLog import readLines
+
 # Example log line (common format produced by Evaluator):
 #   SMA bot 53 sold at 219.97500610351562 for a profit of -2.3350006103515626. SMA: 221.2007555691701.
 #
@@ -41,10 +54,17 @@ SELL_RE = re.compile(
     re.IGNORECASE,
 )
 
+# Totals lines of strategies stopped early by successive halving end with this marker:
+#   SMA 53: -4.21 [pruned day 10]
+PRUNED_RE = re.compile(r"\s*\[pruned day (?P<day>\d+)\]")
+
 
 def parse_log(path: str) -> Tuple[Dict[int, Dict[str, float]], Dict[str, float]]:
     """Parse an evaluation log file and aggregate sell trades per SMA.
 
+    Rotated segments of the log (AMZN_EvaluationLog.00001.txt.gz, ...) are
+    read first, in order, followed by the active file.
+
     Returns:
         per_sma: dict mapping sma -> {'count': int, 'total': float, 'positive': int}
         overall: dict with keys 'count', 'total', 'positive'
@@ -52,12 +72,13 @@ def parse_log(path: str) -> Tuple[Dict[int, Dict[str, float]], Dict[str, float]]
     per_sma = defaultdict(lambda: {'count': 0, 'total': 0.0, 'positive': 0})
     overall = {'count': 0, 'total': 0.0, 'positive': 0}
 
-    # Open the log and iterate line-by-line. This keeps memory usage low when
-    # analyzing large logs. We try a strict regex match first (SELL_RE). If the
-    # strict match fails but the line contains the text "for a profit of" we
-    # attempt a permissive fallback parse to salvage the profit value.
+    # Stream the log line-by-line across its rotated (compressed) segments and
+    # the active file. This keeps memory usage low when analyzing large logs.
+    # We try a strict regex match first (SELL_RE). If the strict match fails
+    # but the line contains the text "for a profit of" we attempt a
+    # permissive fallback parse to salvage the profit value.
     try:
-        with open(path, 'r', encoding='utf-8') as fh:
+        with closing(readLines(path)) as fh:
             for line in fh:
                 # Try strict regex match first (recommended format)
                 m = SELL_RE.search(line)
@@ -113,8 +134,49 @@ def parse_log(path: str) -> Tuple[Dict[int, Dict[str, float]], Dict[str, float]]
     return per_sma, overall
 
 
-def summarize(per_sma: Dict[int, Dict[str, float]], overall: Dict[str, float], top: int = 10) -> None:
-    """Print a human-friendly summary of aggregated results."""
+def format_sma(sma) -> str:
+    """Label for an SMA key: '53' for a single window, '5/20' for a (fast, slow) pair."""
+    if isinstance(sma, tuple):
+        return '/'.join(str(w) for w in sma)
+    return str(sma)
+
+
+RISK_COLUMNS = ('max_drawdown', 'sharpe', 'exposure')
+
+
+def load_risk(path: str) -> Dict[int, Dict[str, float]]:
+    """Load per-SMA streaming risk metrics (<STOCK>_Risk.csv) kept by the evaluator.
+
+    Returns a mapping sma -> {'max_drawdown', 'sharpe', 'exposure'}.
+    """
+    risk = {}
+    with open(path, 'r', newline='', encoding='utf-8') as fh:
+        for row in csv.DictReader(fh):
+            try:
+                risk[int(row['sma'])] = {col: float(row[col]) for col in RISK_COLUMNS}
+            except (KeyError, ValueError):
+                continue
+    return risk
+
+
+def format_risk(risk: Optional[Dict[int, Dict[str, float]]], sma) -> str:
+    """Suffix with risk metrics for a summary line (empty if unavailable)."""
+    if not risk or sma not in risk:
+        return ''
+    r = risk[sma]
+    return f", max_dd={r['max_drawdown']:.6f}, sharpe={r['sharpe']:.3f}, exposure={r['exposure']:.3f}"
+
+
+def format_pruned(pruned: Optional[Dict[int, int]], sma) -> str:
+    """Suffix marking SMAs stopped early by successive halving (empty otherwise)."""
+    if not pruned or sma not in pruned:
+        return ''
+    return f" [pruned day {pruned[sma]}]"
+
+
+def summarize(per_sma: Dict[int, Dict[str, float]], overall: Dict[str, float], top: int = 10,
+              risk: Optional[Dict[int, Dict[str, float]]] = None, pruned: Optional[Dict[int, int]] = None) -> None:
+    """Print a human-friendly summary of aggregated results (with risk metrics/pruning when given)."""
     print(f"Parsed sells: {overall['count']}")
     print(f"Overall total profit from sells: {overall['total']:.6f}")
     avg = (overall['total'] / overall['count']) if overall['count'] else 0.0
@@ -127,30 +189,95 @@ def summarize(per_sma: Dict[int, Dict[str, float]], overall: Dict[str, float], t
     print(f"Top {top} worst SMAs (by total profit):")
     for sma, stats in smas[:top]:
         avg_s = (stats['total'] / stats['count']) if stats['count'] else 0.0
-        print(f"  SMA {sma}: trades={stats['count']}, total={stats['total']:.6f}, avg={avg_s:.6f}, positive={stats['positive']}")
+        print(f"  SMA {format_sma(sma)}: trades={stats['count']}, total={stats['total']:.6f}, avg={avg_s:.6f}, positive={stats['positive']}{format_risk(risk, sma)}{format_pruned(pruned, sma)}")
 
     print(f"\nTop {top} best SMAs (by total profit):")
     for sma, stats in reversed(smas[-top:]):
         avg_s = (stats['total'] / stats['count']) if stats['count'] else 0.0
-        print(f"  SMA {sma}: trades={stats['count']}, total={stats['total']:.6f}, avg={avg_s:.6f}, positive={stats['positive']}")
+        print(f"  SMA {format_sma(sma)}: trades={stats['count']}, total={stats['total']:.6f}, avg={avg_s:.6f}, positive={stats['positive']}{format_risk(risk, sma)}{format_pruned(pruned, sma)}")
 
 
-def write_csv(per_sma: Dict[int, Dict[str, float]], out_path: str) -> None:
-    """Write per-SMA aggregate stats to CSV (columns: sma, trades, total, avg, positive)."""
+def write_csv(per_sma: Dict[int, Dict[str, float]], out_path: str,
+              risk: Optional[Dict[int, Dict[str, float]]] = None, pruned: Optional[Dict[int, int]] = None) -> None:
+    """Write per-SMA aggregate stats to CSV (columns: sma, trades, total, avg, positive[, risk metrics][, pruned_day])."""
     with open(out_path, 'w', newline='', encoding='utf-8') as csvfile:
         writer = csv.writer(csvfile)
-        writer.writerow(['sma', 'trades', 'total_profit', 'avg_profit', 'positive_trades'])
+        header = ['sma', 'trades', 'total_profit', 'avg_profit', 'positive_trades']
+        if risk:
+            header += list(RISK_COLUMNS)
+        if pruned:
+            header.append('pruned_day')
+        writer.writerow(header)
         for sma in sorted(per_sma.keys()):
             stats = per_sma[sma]
             avg = (stats['total'] / stats['count']) if stats['count'] else 0.0
-            writer.writerow([sma, stats['count'], f"{stats['total']:.6f}", f"{avg:.6f}", stats['positive']])
+            row = [format_sma(sma), stats['count'], f"{stats['total']:.6f}", f"{avg:.6f}", stats['positive']]
+            if risk:
+                r = risk.get(sma)
+                row += [f"{r[col]:.6f}" for col in RISK_COLUMNS] if r else [''] * len(RISK_COLUMNS)
+            if pruned:
+                row.append(pruned.get(sma, ''))
+            writer.writerow(row)
+
+
+def per_sma_from_arrays(windows, results) -> Tuple[Dict[int, Dict[str, float]], Dict[int, Dict[str, float]]]:
+    """Convert per-window result arrays (evaluate.Simulator.RESULT_FIELDS) into (per_sma, risk) dicts."""
+    per_sma = {}
+    risk = {}
+    for k, w in enumerate(windows):
+        per_sma[int(w)] = {'count': int(results['trades'][k]), 'total': float(results['total'][k]), 'positive': int(results['wins'][k])}
+        risk[int(w)] = {col: float(results[col][k]) for col in RISK_COLUMNS}
+    return per_sma, risk
+
+
+def summarize_intervals(per_interval: Dict[str, Dict[int, Dict[str, float]]], top: int = 10) -> None:
+    """Print per-interval totals and the best windows of every interval side by side."""
+    intervals = list(per_interval)
+    width = 24
+    print('Interval'.ljust(10) + ''.join(iv.ljust(width) for iv in intervals))
+    print('trades'.ljust(10) + ''.join(str(sum(s['count'] for s in per_interval[iv].values())).ljust(width) for iv in intervals))
+    print('total'.ljust(10) + ''.join(f"{sum(s['total'] for s in per_interval[iv].values()):.6f}".ljust(width) for iv in intervals))
+    ranked = {iv: sorted(per_interval[iv].items(), key=lambda kv: kv[1]['total'], reverse=True)[:top] for iv in intervals}
+    print(f"\nTop {top} best SMAs per interval (by total profit):")
+    for rank in range(top):
+        cells = []
+        for iv in intervals:
+            if rank < len(ranked[iv]):
+                sma, stats = ranked[iv][rank]
+                cells.append(f"SMA {format_sma(sma)} ({stats['total']:+.4f})".ljust(width))
+            else:
+                cells.append(''.ljust(width))
+        print(f"#{rank + 1}".ljust(10) + ''.join(cells))
+
+
+def write_interval_csv(per_interval: Dict[str, Dict[int, Dict[str, float]]], out_path: str) -> None:
+    """Write one row per SMA with trades/total/positive/rank columns for every interval."""
+    intervals = list(per_interval)
+    ranks = {}
+    for iv in intervals:
+        ordered = sorted(per_interval[iv], key=lambda sma: per_interval[iv][sma]['total'], reverse=True)
+        ranks[iv] = {sma: rank + 1 for rank, sma in enumerate(ordered)}
+    smas = sorted(set().union(*(per_interval[iv].keys() for iv in intervals)))
+    with open(out_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        header = ['sma']
+        for iv in intervals:
+            header += [f'{iv}_trades', f'{iv}_total_profit', f'{iv}_positive_trades', f'{iv}_rank']
+        writer.writerow(header)
+        for sma in smas:
+            row = [format_sma(sma)]
+            for iv in intervals:
+                stats = per_interval[iv].get(sma)
+                row += [stats['count'], f"{stats['total']:.6f}", stats['positive'], ranks[iv][sma]] if stats else [''] * 4
+            writer.writerow(row)
 
 
 def parse_totals_file(path: str) -> Dict[int, float]:
     """Parse a <STOCK>_Totals.txt file produced by LogManager.appendToTotals.
 
     Returns a mapping sma -> reported_total (float).
-    Expected lines: 'SMA 1: -165.3868' or 'SMA 1: 12.34'
+    Expected lines: 'SMA 1: -165.3868' or 'SMA 1: 12.34' (pruned SMAs carry a
+    trailing '[pruned day N]' marker, see parse_pruned_days)
     """
     totals = {}
     with open(path, 'r', encoding='utf-8') as fh:
@@ -167,7 +294,7 @@ def parse_totals_file(path: str) -> Dict[int, float]:
                 if not m:
                     continue
                 sma = int(m.group(1))
-                val_str = right.strip().rstrip('.;,')
+                val_str = PRUNED_RE.sub('', right).strip().rstrip('.;,')
                 try:
                     val = float(val_str)
                 except ValueError:
@@ -179,14 +306,33 @@ def parse_totals_file(path: str) -> Dict[int, float]:
     return totals
 
 
-def report_totals_discrepancies(per_sma: Dict[int, Dict[str, float]], totals: Dict[int, float]) -> None:
+def parse_pruned_days(path: str) -> Dict[int, int]:
+    """Return sma -> day after which successive halving pruned it, from a totals file."""
+    pruned = {}
+    with open(path, 'r', encoding='utf-8') as fh:
+        for line in fh:
+            m = PRUNED_RE.search(line)
+            sma_m = re.match(r"\s*SMA\s+(\d+)", line)
+            if m and sma_m:
+                pruned[int(sma_m.group(1))] = int(m.group('day'))
+    return pruned
+
+
+def report_totals_discrepancies(per_sma: Dict[int, Dict[str, float]], totals: Dict[int, float],
+                                pruned: Optional[Dict[int, int]] = None) -> None:
     """Compare realized sell aggregates (per_sma) to reported totals and print discrepancies.
 
-    Flags SMAs where sign differs or absolute difference is non-zero.
+    Flags SMAs where sign differs or absolute difference is non-zero. SMAs
+    pruned by successive halving are skipped and listed separately: their
+    totals include the force-liquidation at pruning, which is not a sell.
     """
     print('\nComparing realized sell aggregates to totals file...')
     discrepancies = []
+    skipped = []
     for sma, reported in totals.items():
+        if pruned and sma in pruned:
+            skipped.append(sma)
+            continue
         agg = per_sma.get(sma)
         if not agg:
             if reported != 0.0:
@@ -200,6 +346,9 @@ def report_totals_discrepancies(per_sma: Dict[int, Dict[str, float]], totals: Di
         elif abs(reported - realized_total) > 1e-6:
             discrepancies.append((sma, 'value_mismatch', reported, realized_total))
 
+    if skipped:
+        print(f'Skipped {len(skipped)} pruned SMAs (totals include the force-liquidation at pruning): '
+              + ', '.join(f'{sma} [pruned day {pruned[sma]}]' for sma in sorted(skipped)))
     if not discrepancies:
         print('No discrepancies found between realized sells and totals file.')
         return
@@ -209,6 +358,51 @@ def report_totals_discrepancies(per_sma: Dict[int, Dict[str, float]], totals: Di
         print(f'  SMA {sma}: {kind} -> reported={reported:.6f}, realized={realized:.6f}')
 
 
+def record_results(per_sma: Dict[int, Dict[str, float]], db_path: str, stock: str, run_id: Optional[str],
+                   config=None) -> str:
+    """Write per-SMA aggregates to the results store in one transaction. Returns the run id used.
+
+    config is the EvalConfig the results were produced with; it sets the run's
+    fingerprint (default: the values in Config.py).
+    """
+    from data.ResultStore import ResultStore, newRunId
+
+    if not run_id:
+        run_id = None
+        if os.path.exists('RunId.txt'):
+            with open('RunId.txt', 'r', encoding='utf-8') as fh:
+                run_id = fh.readline().strip() or None
+        if run_id is None:
+            run_id = newRunId()
+    store = ResultStore(db_path)
+    try:
+        store.beginRun(run_id, stock, config)
+        store.writeWindowResults(run_id, stock, per_sma)
+    finally:
+        store.close()
+    return run_id
+
+
+def report_from_db(db_path: str, mode: str, stock: Optional[str], runs: int, top: int) -> None:
+    """Print indexed queries from the results store."""
+    from data.ResultStore import ResultStore
+
+    store = ResultStore(db_path)
+    try:
+        if mode == 'best':
+            rows = store.bestWindows(stock, lastRuns=runs, limit=top)
+            print(f"Top {top} SMAs for {stock} over the last {runs} run(s) (by average total):")
+            for sma, avg_total, best_total, n_runs, trades, wins in rows:
+                print(f"  SMA {sma}: avg_total={avg_total:.6f}, best_total={best_total:.6f}, runs={n_runs}, trades={trades}, positive={wins}")
+        else:
+            rows = store.topWindows(limit=top)
+            print(f"Top {top} SMAs across all symbols and runs (by total profit):")
+            for symbol, sma, total, trades, wins, run_id in rows:
+                print(f"  {symbol} SMA {sma}: total={total:.6f}, trades={trades}, positive={wins}, run={run_id}")
+    finally:
+        store.close()
+
+
 def main(argv=None):
     parser = argparse.ArgumentParser(description='Analyze SMA evaluation logs (sell trades).')
     parser.add_argument('--stock', '-s', help="Stock symbol (will look for '<STOCK>_EvaluationLog.txt')")
@@ -217,8 +411,21 @@ def main(argv=None):
     parser.add_argument('--csv', help='Optional CSV output path for per-SMA stats')
     parser.add_argument('--compare-totals', action='store_true', help='Compare against <STOCK>_Totals.txt and list discrepancies')
     parser.add_argument('--totals-file', help='Path to totals file (overrides --stock)')
+    parser.add_argument('--risk-file', help="Risk metrics CSV (default '<STOCK>_Risk.csv' when --stock is given)")
+    parser.add_argument('--db', help='SQLite results store to record per-SMA aggregates into')
+    parser.add_argument('--run-id', help='Run id to record under (default: RunId.txt)')
+    parser.add_argument('--db-report', choices=['best', 'top'], help="Query the results store ('best' needs --stock) and exit")
+    parser.add_argument('--runs', type=int, default=5, help='Number of most recent runs for --db-report best')
     args = parser.parse_args(argv)
 
+    if args.db_report:
+        if not args.db:
+            parser.error('--db-report requires --db')
+        if args.db_report == 'best' and not args.stock:
+            parser.error('--db-report best requires --stock')
+        report_from_db(args.db, args.db_report, args.stock, args.runs, args.top)
+        return
+
     if not args.stock and not args.log_file:
         parser.error('Specify --stock or --log-file')
 
@@ -230,15 +437,30 @@ def main(argv=None):
         print(f"Error: log file not found: {path}")
         sys.exit(2)
 
-    summarize(per_sma, overall, top=args.top)
+    risk_path = args.risk_file if args.risk_file else (f"{args.stock}_Risk.csv" if args.stock else None)
+    risk = None
+    if risk_path and os.path.exists(risk_path):
+        risk = load_risk(risk_path)
+    elif args.risk_file:
+        print(f"Risk file not found: {args.risk_file}")
+
+    # SMAs pruned by successive halving are marked from the totals file
+    totals_path = args.totals_file if args.totals_file else (f"{args.stock}_Totals.txt" if args.stock else None)
+    pruned = parse_pruned_days(totals_path) if totals_path and os.path.exists(totals_path) else None
+
+    summarize(per_sma, overall, top=args.top, risk=risk, pruned=pruned)
 
     if args.csv:
-        write_csv(per_sma, args.csv)
+        write_csv(per_sma, args.csv, risk=risk, pruned=pruned)
         print(f"Wrote CSV to {args.csv}")
 
+    if args.db:
+        stock = args.stock if args.stock else os.path.basename(path).split('_EvaluationLog')[0]
+        run_id = record_results(per_sma, args.db, stock, args.run_id)
+        print(f"Recorded {len(per_sma)} SMA results to {args.db} (run {run_id})")
+
     # Optionally compare to totals file
     if getattr(args, 'compare_totals', False):
-        totals_path = args.totals_file if args.totals_file else (f"{args.stock}_Totals.txt" if args.stock else None)
         if not totals_path:
             print("Error: --compare-totals requires --stock or --totals-file")
             sys.exit(2)
@@ -247,7 +469,7 @@ def main(argv=None):
         except FileNotFoundError:
             print(f"Totals file not found: {totals_path}")
             sys.exit(2)
-        report_totals_discrepancies(per_sma, totals)
+        report_totals_discrepancies(per_sma, totals, pruned)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,314 @@
+"""Distribute SMA evaluation sweeps across worker processes and machines.
+
+A sweep is the product symbols x SMA window ranges x Config parameter sets.
+The coordinator splits it into shards in a durable SQLite queue inside a
+sweep directory; any number of workers (on this host or on hosts that share
+the directory) claim shards under leases, run the Evaluater on them and
+record per-SMA results in the sweep's results store.
+
+Usage examples:
+    # 2 symbols x 4 window chunks x 2 trade modes = 16 shards
+    python3 tools/Sweep.py enqueue --dir sweeps/s1 --symbols AAPL,MSFT --window-chunk 50 \\
+        --param TRADE_MODE=momentum,mean_reversion
+
+    # run 4 local worker processes until the queue is drained
+    python3 tools/Sweep.py worker --dir sweeps/s1 --processes 4
+
+    # run shards inside one long-lived process per worker (no start-up per shard)
+    python3 tools/Sweep.py worker --dir sweeps/s1 --processes 4 --in-process
+
+    # show progress and failures
+    python3 tools/Sweep.py status --dir sweeps/s1
+
+Each shard runs in its own working directory (<dir>/shards/<id>/), so the
+file-based session state of concurrent evaluations never collides, and with
+its own immutable EvalConfig built from the shard's overrides; all shards
+share the sweep's result cache (<dir>/Cache/). By default
+every shard gets a fresh child process; with --in-process the worker
+evaluates its shards one after another in its own interpreter, renewing the
+lease from a helper thread.
+"""
+
+from __future__ import annotations
+import argparse
+import contextlib
+import itertools
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+from typing import Dict, List
+
+# allow importing repo modules (data/, evaluate/, Config) when run as tools/Sweep.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Config
+from EvalConfig import PROCESS_FIELDS, EvalConfig, parseValue
+from data.WorkQueue import WorkQueue
+
+
+def queue_path(sweep_dir: str) -> str:
+    return os.path.join(sweep_dir, "queue.db")
+
+
+def results_path(sweep_dir: str) -> str:
+    return os.path.join(sweep_dir, "Results.db")
+
+
+def cache_path(sweep_dir: str) -> str:
+    return os.path.join(sweep_dir, "Cache")
+
+
+# The window grid is split into shards from --sma-min/--sma-max and Config.SMA_STEP,
+# so these cannot vary per shard
+WINDOW_PARAMS = ("SMA_MIN", "SMA_MAX", "SMA_STEP")
+
+
+def parse_param(spec: str) -> tuple:
+    """Parse 'NAME=v1,v2' into (NAME, [values]); values are JSON-decoded when possible."""
+    name, sep, raw = spec.partition('=')
+    name = name.strip()
+    if name in WINDOW_PARAMS:
+        raise ValueError(f"{name} cannot be swept with --param (use --sma-min/--sma-max for the window range)")
+    if name in PROCESS_FIELDS:
+        raise ValueError(f"{name} is a process-wide setting, not an evaluation parameter")
+    if not sep or not hasattr(Config, name) or not name.isupper():
+        raise ValueError(f"Unknown Config parameter in '{spec}'")
+    return name, [parseValue(token) for token in raw.split(',')]
+
+
+def build_shards(symbols: List[str], sma_min: int, sma_max: int, chunk: int, params: Dict[str, list]):
+    """Yield (symbol, chunk_min, chunk_max, overrides) for the full sweep product.
+
+    Every override combination is checked with EvalConfig first, so an invalid
+    one raises ValueError before anything is enqueued.
+    """
+    step = Config.SMA_STEP
+    chunk = max(chunk, step)
+    ranges = []
+    start = sma_min
+    while start <= sma_max:
+        # keep chunk boundaries on the SMA_STEP grid
+        end = min(start + ((chunk - 1) // step) * step, sma_max)
+        ranges.append((start, end))
+        start = end + step
+    names = sorted(params)
+    for combo in itertools.product(*(params[n] for n in names)):
+        overrides = dict(zip(names, combo))
+        EvalConfig.fromConfig(**overrides)
+        for symbol in symbols:
+            for lo, hi in ranges:
+                yield symbol, lo, hi, overrides
+
+
+def shard_config(shard: dict, results_db: str, cache_dir: str) -> EvalConfig:
+    """The shard's EvalConfig: Config.py defaults, its parameter overrides and its window range.
+
+    Every shard uses the sweep's results store and result cache (absolute
+    paths), so cached SMA columns are shared across shards and sweep runs.
+    """
+    return EvalConfig.fromConfig(**dict(shard['params'], SMA_MIN=shard['sma_min'], SMA_MAX=shard['sma_max'],
+                                        RESULTS_DB=results_db, CACHE_DIR=cache_dir, METRICS_PORT=0))
+
+
+def evaluate_shard(shard: dict, results_db: str, cache_dir: str, run_id: str) -> None:
+    """Evaluate one shard in the current working directory and record its results."""
+    from data.EvalLog import removeSegments
+    from evaluate.Evaluator import Evaluater
+    from tools.Analyze import parse_log, record_results
+
+    config = shard_config(shard, results_db, cache_dir)
+    symbol = shard['symbol']
+    for path, content in (("Stock.txt", symbol), ("RunId.txt", run_id), ("DayIndex.txt", "1"), ("PriceIndex.txt", "1"),
+                          (f"{symbol}_Totals.txt", ""), (f"{symbol}_EvaluationLog.txt", "")):
+        with open(path, "w") as fh:
+            fh.write(content)
+    if os.path.exists(f"{symbol}_Risk.csv"):
+        os.remove(f"{symbol}_Risk.csv")
+    removeSegments(f"{symbol}_EvaluationLog.txt")
+
+    Evaluater(symbol, metricsPort=0, config=config).start()
+    per_sma, _ = parse_log(f"{symbol}_EvaluationLog.txt")
+    record_results(per_sma, results_db, symbol, run_id, config)
+
+
+def run_shard(shard: dict, shard_dir: str, results_db: str, cache_dir: str, run_id: str) -> None:
+    """Child-process entry point: evaluate one shard in its own working directory."""
+    os.makedirs(shard_dir, exist_ok=True)
+    os.chdir(shard_dir)
+    sys.stdout = open("Console.txt", "w", buffering=1)
+    sys.stderr = sys.stdout
+
+    from data.DebugLog import configureLogging, stopLogging
+    configureLogging("Debug.log")
+    evaluate_shard(shard, results_db, cache_dir, run_id)
+    stopLogging()
+
+
+def run_shard_in_process(shard: dict, shard_dir: str, results_db: str, cache_dir: str, run_id: str) -> None:
+    """Evaluate one shard inside the calling worker process, then restore its working directory."""
+    from data.DebugLog import configureLogging, stopLogging
+
+    cwd = os.getcwd()
+    os.makedirs(shard_dir, exist_ok=True)
+    os.chdir(shard_dir)
+    try:
+        with open("Console.txt", "w", buffering=1) as console, contextlib.redirect_stdout(console):
+            configureLogging("Debug.log")
+            evaluate_shard(shard, results_db, cache_dir, run_id)
+    finally:
+        stopLogging()
+        os.chdir(cwd)
+
+
+def keep_lease(sweep_dir: str, shard_id: int, worker: str, lease: float, stop: threading.Event) -> None:
+    """Helper thread: renew a shard's lease until stop is set (own connection, sqlite is per thread)."""
+    queue = WorkQueue(queue_path(sweep_dir))
+    try:
+        while not stop.wait(max(lease / 3.0, 1.0)):
+            if not queue.renew(shard_id, worker, lease):
+                print(f"[{worker}] lost lease on shard {shard_id}; its result will not be marked done")
+                return
+    finally:
+        queue.close()
+
+
+def worker_loop(sweep_dir: str, lease: float, max_attempts: int, once: bool, in_process: bool = False) -> None:
+    """Claim and run shards until the queue has nothing runnable left."""
+    worker = f"{socket.gethostname()}-{os.getpid()}"
+    queue = WorkQueue(queue_path(sweep_dir), maxAttempts=max_attempts)
+    results_db = os.path.abspath(results_path(sweep_dir))
+    cache_dir = os.path.abspath(cache_path(sweep_dir))
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        while True:
+            shard = queue.claim(worker, lease)
+            if shard is None:
+                print(f"[{worker}] no runnable shards left")
+                return
+            shard_id = shard['shard_id']
+            run_id = f"{shard['sweep']}-shard{shard_id}-a{shard['attempt']}"
+            shard_dir = os.path.abspath(os.path.join(sweep_dir, "shards", str(shard_id)))
+            print(f"[{worker}] shard {shard_id}: {shard['symbol']} SMA {shard['sma_min']}-{shard['sma_max']} {shard['params']}")
+            if in_process:
+                stop = threading.Event()
+                keeper = threading.Thread(target=keep_lease, args=(sweep_dir, shard_id, worker, lease, stop), daemon=True)
+                keeper.start()
+                try:
+                    run_shard_in_process(shard, shard_dir, results_db, cache_dir, run_id)
+                except Exception as e:
+                    queue.fail(shard_id, worker, f"{type(e).__name__}: {e} (see {shard_dir}/Debug.log)")
+                    print(f"[{worker}] shard {shard_id} failed: {e}")
+                else:
+                    queue.complete(shard_id, worker, run_id)
+                    print(f"[{worker}] shard {shard_id} done (run {run_id})")
+                finally:
+                    stop.set()
+                    keeper.join()
+                if once:
+                    return
+                continue
+            proc = ctx.Process(target=run_shard, args=(shard, shard_dir, results_db, cache_dir, run_id))
+            proc.start()
+            lost = False
+            while proc.is_alive():
+                proc.join(timeout=max(lease / 3.0, 1.0))
+                if proc.is_alive() and not queue.renew(shard_id, worker, lease):
+                    # another worker took the shard over after our lease expired
+                    print(f"[{worker}] lost lease on shard {shard_id}, stopping it")
+                    proc.terminate()
+                    proc.join()
+                    lost = True
+            if lost:
+                continue
+            if proc.exitcode == 0:
+                queue.complete(shard_id, worker, run_id)
+                print(f"[{worker}] shard {shard_id} done (run {run_id})")
+            else:
+                queue.fail(shard_id, worker, f"exit code {proc.exitcode} (see {shard_dir}/Console.txt)")
+                print(f"[{worker}] shard {shard_id} failed with exit code {proc.exitcode}")
+            if once:
+                return
+    finally:
+        queue.close()
+
+
+def cmd_enqueue(args) -> None:
+    params = dict(parse_param(spec) for spec in (args.param or []))
+    symbols = [s.strip() for s in args.symbols.split(',') if s.strip()]
+    sma_min = args.sma_min if args.sma_min is not None else Config.SMA_MIN
+    sma_max = args.sma_max if args.sma_max is not None else Config.SMA_MAX
+    os.makedirs(args.dir, exist_ok=True)
+    queue = WorkQueue(queue_path(args.dir))
+    try:
+        sweep = args.name or os.path.basename(os.path.abspath(args.dir))
+        count = queue.enqueue(sweep, build_shards(symbols, sma_min, sma_max, args.window_chunk, params))
+    finally:
+        queue.close()
+    print(f"Enqueued {count} shard(s) for sweep '{sweep}' in {queue_path(args.dir)}")
+
+
+def cmd_worker(args) -> None:
+    if args.processes <= 1:
+        worker_loop(args.dir, args.lease, args.max_attempts, args.once, args.in_process)
+        return
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=worker_loop, args=(args.dir, args.lease, args.max_attempts, args.once, args.in_process))
+             for _ in range(args.processes)]
+    for proc in procs:
+        proc.start()
+        time.sleep(0.1)  # stagger the first claims
+    for proc in procs:
+        proc.join()
+
+
+def cmd_status(args) -> None:
+    queue = WorkQueue(queue_path(args.dir))
+    try:
+        counts = queue.status()
+        total = sum(counts.values())
+        print(f"Shards: {total} total, " + ", ".join(f"{state}={n}" for state, n in sorted(counts.items())))
+        for shard_id, symbol, lo, hi, params, attempts, error in queue.failures():
+            print(f"  FAILED shard {shard_id}: {symbol} SMA {lo}-{hi} {params} after {attempts} attempt(s): {error}")
+    finally:
+        queue.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Shard SMA evaluation sweeps over a durable work queue.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    enq = sub.add_parser('enqueue', help='Split a sweep into shards and add them to the queue')
+    enq.add_argument('--dir', required=True, help='Sweep directory (queue.db, Results.db and shard working dirs)')
+    enq.add_argument('--symbols', required=True, help='Comma-separated stock symbols')
+    enq.add_argument('--sma-min', type=int, help='Smallest SMA window (default Config.SMA_MIN)')
+    enq.add_argument('--sma-max', type=int, help='Largest SMA window (default Config.SMA_MAX)')
+    enq.add_argument('--window-chunk', type=int, default=50, help='SMA windows per shard')
+    enq.add_argument('--param', action='append', metavar='NAME=V1,V2', help='Config parameter values to sweep (repeatable)')
+    enq.add_argument('--name', help='Sweep name used in run ids (default: directory name)')
+    enq.set_defaults(func=cmd_enqueue)
+
+    wrk = sub.add_parser('worker', help='Claim and run shards until none are runnable')
+    wrk.add_argument('--dir', required=True, help='Sweep directory')
+    wrk.add_argument('--processes', type=int, default=1, help='Worker processes to run on this host')
+    wrk.add_argument('--lease', type=float, default=600.0, help='Lease length in seconds (renewed while a shard runs)')
+    wrk.add_argument('--max-attempts', type=int, default=3, help='Attempts before a shard is marked failed')
+    wrk.add_argument('--once', action='store_true', help='Run at most one shard per worker process')
+    wrk.add_argument('--in-process', action='store_true', help='Evaluate shards inside the worker process instead of a fresh process each')
+    wrk.set_defaults(func=cmd_worker)
+
+    st = sub.add_parser('status', help='Show shard counts by state and failures')
+    st.add_argument('--dir', required=True, help='Sweep directory')
+    st.set_defaults(func=cmd_status)
+
+    args = parser.parse_args(argv)
+    try:
+        args.func(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == '__main__':
+    main()